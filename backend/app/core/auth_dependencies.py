@@ -1,26 +1,55 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from database import get_db
-from auth import verify_token, get_user_by_username
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, AsyncSessionLocal
+from auth import verify_token_claims, get_user_by_username_async
+from models import User
+from app.core.revocations import get_revoked_users
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-# Dependency to get current user
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+class TokenUser:
+    """The authenticated user as described by a verified access token (no database row loaded)."""
+
+    def __init__(self, id: int, username: str, is_active: bool = True):
+        self.id = id
+        self.username = username
+        self.is_active = is_active
+
+def credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    username = verify_token(token)
-    if username is None:
-        raise credentials_exception
-    
-    user = get_user_by_username(db, username=username)
-    if user is None:
-        raise credentials_exception
-    
+
+# Dependency to get current user
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenUser:
+    claims = verify_token_claims(token)
+    if claims is None:
+        raise credentials_exception()
+
+    user_id = claims.get("uid")
+    if user_id is None:
+        # Token issued before tokens carried uid/active: look the user up instead
+        async with AsyncSessionLocal() as db:
+            user = await get_user_by_username_async(db, username=claims["sub"])
+        if user is None or not user.is_active:
+            raise credentials_exception()
+        return TokenUser(user.id, user.username, user.is_active)
+
+    if not claims.get("active", False) or await get_revoked_users().is_revoked(user_id):
+        raise credentials_exception()
+
+    return TokenUser(user_id, claims["sub"])
+
+# Dependency for routes that need the full ORM user, not just who is calling
+async def get_current_db_user(
+    current_user: TokenUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    user = await db.get(User, current_user.id)
+    if user is None or not user.is_active:
+        raise credentials_exception()
     return user
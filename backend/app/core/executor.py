@@ -0,0 +1,101 @@
+# executor.py
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+class ExecutorSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+class PredictionExecutor:
+    """Bounded worker pool that keeps CPU-bound prediction work off the event loop."""
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="predictor")
+        # One slot per running or waiting task; anything beyond that is rejected
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Tuple[Any, Dict[str, float]]:
+        """Run fn in the pool and return (result, timings) with queue wait and execution time in ms."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ExecutorSaturated("Prediction workers are busy, try again shortly")
+
+        submitted = time.perf_counter()
+        timings = {}
+
+        def task():
+            started = time.perf_counter()
+            timings['queue_wait_ms'] = (started - submitted) * 1000
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings['execution_ms'] = (time.perf_counter() - started) * 1000
+
+        def release(_future=None):
+            # Done callback: runs when the task finishes, or when it is cancelled
+            # before it started, so the slot is held while the work occupies the pool
+            self._slots.release()
+            with self._lock:
+                self._in_flight -= 1
+                self.completed += 1
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._pool.submit(task)
+        except Exception:
+            release()
+            raise
+        future.add_done_callback(release)
+
+        # Cancelling this await (client gone, timeout, shutdown) cancels the task
+        # only if it has not started; a running task keeps its slot until it returns
+        result = await asyncio.wrap_future(future)
+        return result, timings
+
+    def stats(self) -> Dict:
+        """Current load counters for status endpoints."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+_prediction_executor: Optional[PredictionExecutor] = None
+_prediction_executor_lock = threading.Lock()
+
+def get_prediction_executor() -> PredictionExecutor:
+    """Get the process-wide prediction executor, creating it from settings on first use."""
+    global _prediction_executor
+    with _prediction_executor_lock:
+        if _prediction_executor is None:
+            _prediction_executor = PredictionExecutor(
+                max_workers=settings.prediction_workers,
+                max_queue=settings.prediction_queue_depth
+            )
+        return _prediction_executor
+
+def shutdown_prediction_executor() -> None:
+    """Stop the prediction executor (called from the lifespan on shutdown)."""
+    global _prediction_executor
+    with _prediction_executor_lock:
+        if _prediction_executor is not None:
+            _prediction_executor.shutdown()
+            _prediction_executor = None
@@ -0,0 +1,50 @@
+# fight_stats.py
+import numpy as np
+
+# Per-fight stats averaged over each fighter's last three bouts
+EMA_FEATURES = [
+    'KD', 'SIG_STR_PCT', 'TD_PCT', 'SUB_ATT', 'REV', 'CTRL',
+    'R1_KD', 'R1_SIG_STR_PCT', 'R1_TD_PCT', 'R1_SUB_ATT', 'R1_REV', 'R1_CTRL',
+    'SIG_STR_PCT_DETAILED', 'R1_SIG_STR_PCT_DETAILED',
+    'SIG_STR_LANDED', 'SIG_STR_ATTEMPTED', 'TOTAL_STR_LANDED', 'TOTAL_STR_ATTEMPTED',
+    'TD_LANDED', 'TD_ATTEMPTED',
+    'R1_SIG_STR_LANDED', 'R1_SIG_STR_ATTEMPTED', 'R1_TOTAL_STR_LANDED', 'R1_TOTAL_STR_ATTEMPTED',
+    'R1_TD_LANDED', 'R1_TD_ATTEMPTED',
+    'HEAD_LANDED', 'HEAD_ATTEMPTED', 'BODY_LANDED', 'BODY_ATTEMPTED',
+    'LEG_LANDED', 'LEG_ATTEMPTED',
+    'DISTANCE_LANDED', 'DISTANCE_ATTEMPTED', 'CLINCH_LANDED', 'CLINCH_ATTEMPTED',
+    'GROUND_LANDED', 'GROUND_ATTEMPTED',
+    'R1_HEAD_LANDED', 'R1_HEAD_ATTEMPTED', 'R1_BODY_LANDED', 'R1_BODY_ATTEMPTED',
+    'R1_LEG_LANDED', 'R1_LEG_ATTEMPTED',
+    'R1_DISTANCE_LANDED', 'R1_DISTANCE_ATTEMPTED', 'R1_CLINCH_LANDED', 'R1_CLINCH_ATTEMPTED',
+    'R1_GROUND_LANDED', 'R1_GROUND_ATTEMPTED'
+]
+
+# Row n: weights for the n non-missing values, most recent first
+EMA_WEIGHTS = np.array([
+    [0.0, 0.0, 0.0],
+    [1.0, 0.0, 0.0],
+    [0.6, 0.4, 0.0],
+    [0.5, 0.3, 0.2],
+])
+
+def stat_columns(prefix):
+    """CSV column names for one corner's EMA stats, e.g. stat_columns('p1')"""
+    return [f'{prefix}_{feat}' for feat in EMA_FEATURES]
+
+def recent_weighted_average(recent):
+    """
+    Weighted average over axis 0 of up to three bouts, most recent first.
+
+    Missing values are skipped and the remaining values get the 1 / 0.6-0.4 /
+    0.5-0.3-0.2 weights by how many are present; all-missing gives NaN.
+    Works on (bouts, features) or stacked (bouts, rows, features) arrays.
+    """
+    valid = ~np.isnan(recent)
+    counts = valid.sum(axis=0)
+    ranks = np.minimum(np.cumsum(valid, axis=0) - 1, 2).clip(min=0)
+
+    weights = np.where(valid, EMA_WEIGHTS[counts[np.newaxis], ranks], 0.0)
+    averages = (weights * np.where(valid, recent, 0.0)).sum(axis=0)
+
+    return np.where(counts > 0, averages, np.nan)
@@ -0,0 +1,213 @@
+# fight_store.py
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.fight_stats import stat_columns
+
+# Win methods counted for the method models; everything else maps to 'Other'
+METHOD_GROUPS = ['Decision', 'KO/TKO', 'Submission']
+METHOD_MAPPING = {
+    'Decision - Majority': 'Decision',
+    'Decision - Split': 'Decision',
+    'Decision - Unanimous': 'Decision',
+    "TKO - Doctor's Stoppage": "KO/TKO",
+    'Overturned': 'Other',
+    'Could Not Continue': 'Other',
+    'DQ': 'Other',
+    'Other': 'Other'
+}
+
+# Columns written to / read from a dataset cache directory, one .npy each
+FIGHT_COLUMNS = ['p1_ids', 'p2_ids', 'event_days', 'winner', 'method_codes', 'p1_stats', 'p2_stats']
+INDEX_COLUMNS = ['offsets', 'appearance_rows', 'appearance_days', 'appearance_was_p1', 'appearance_won']
+
+def to_day_number(value, ceil: bool = False) -> int:
+    """Days since 1970-01-01; with ceil=True a time past midnight rounds up to the next day."""
+    ts = pd.Timestamp(value)
+    day = int(ts.to_datetime64().astype('datetime64[D]').astype(np.int64))
+    if ceil and ts != ts.normalize():
+        day += 1
+    return day
+
+class FightStore:
+    """
+    Column-oriented copy of ufc_cleaned.csv holding only what predictions read.
+
+    Fight columns (one entry per CSV row): p1_ids / p2_ids (int32 fighter ids),
+    event_days (int32 days since epoch), winner (int8, 1 = p1 won),
+    method_codes (int8 codes into method_categories) and p1_stats / p2_stats
+    (float32 (n_fights, n_stats) matrices in EMA_FEATURES order).
+
+    Per-fighter appearances are stored CSR-style, oldest first: fighter i's
+    bouts are positions offsets[i]:offsets[i + 1] of appearance_rows,
+    appearance_days, appearance_was_p1 and appearance_won.
+    """
+
+    def __init__(self, fighter_names, p1_ids, p2_ids, event_days, winner,
+                 method_codes, method_categories, p1_stats, p2_stats, n_source_columns,
+                 index: Optional[Dict[str, np.ndarray]] = None):
+        self.fighter_names = list(fighter_names)
+        self.fighter_ids = {name: i for i, name in enumerate(self.fighter_names)}
+        self.p1_ids = p1_ids
+        self.p2_ids = p2_ids
+        self.event_days = event_days
+        self.winner = winner
+        self.method_codes = method_codes
+        self.method_categories = list(method_categories)
+        self.p1_stats = p1_stats
+        self.p2_stats = p2_stats
+        self.n_source_columns = n_source_columns
+
+        # Method category code -> index into METHOD_GROUPS, -1 for 'Other'
+        groups = [METHOD_MAPPING.get(m, m) for m in self.method_categories]
+        self.method_group_codes = np.array(
+            [METHOD_GROUPS.index(g) if g in METHOD_GROUPS else -1 for g in groups], dtype=np.int8
+        )
+
+        if index is None:
+            self._build_appearances()
+        else:
+            for name in INDEX_COLUMNS:
+                setattr(self, name, index[name])
+
+    @classmethod
+    def from_dataframe(cls, cleaned_df: pd.DataFrame) -> 'FightStore':
+        """Convert the cleaned fight table; the DataFrame is not kept."""
+        fighter_codes, fighter_names = pd.factorize(
+            np.concatenate([cleaned_df['p1_fighter'].to_numpy(), cleaned_df['p2_fighter'].to_numpy()])
+        )
+        fighter_codes = fighter_codes.astype(np.int32)
+        n_rows = len(cleaned_df)
+
+        method = pd.Categorical(cleaned_df['method'])
+        event_days = pd.to_datetime(cleaned_df['event_date']).to_numpy().astype('datetime64[D]').astype(np.int32)
+
+        def corner_stats(prefix):
+            block = cleaned_df[stat_columns(prefix)].apply(pd.to_numeric, errors='coerce')
+            return np.ascontiguousarray(block.to_numpy(dtype=np.float32))
+
+        return cls(
+            fighter_names=fighter_names.tolist(),
+            p1_ids=fighter_codes[:n_rows],
+            p2_ids=fighter_codes[n_rows:],
+            event_days=event_days,
+            winner=cleaned_df['winner'].to_numpy().astype(np.int8),
+            method_codes=method.codes.astype(np.int8),
+            method_categories=method.categories.tolist(),
+            p1_stats=corner_stats('p1'),
+            p2_stats=corner_stats('p2'),
+            n_source_columns=cleaned_df.shape[1]
+        )
+
+    def _build_appearances(self) -> None:
+        n_rows = len(self.event_days)
+        positions = np.arange(n_rows, dtype=np.int32)
+
+        fighters = np.concatenate([self.p1_ids, self.p2_ids])
+        rows = np.concatenate([positions, positions])
+        was_p1 = np.concatenate([np.ones(n_rows, dtype=bool), np.zeros(n_rows, dtype=bool)])
+        won = np.concatenate([self.winner == 1, self.winner == 0])
+        days = self.event_days[rows]
+
+        # Group by fighter, oldest first within a fighter. The CSV lists later
+        # bouts first, so same-day bouts go in descending row order: the
+        # earliest row is treated as the most recent bout
+        order = np.lexsort((-rows, days, fighters))
+        self.appearance_rows = rows[order]
+        self.appearance_days = days[order]
+        self.appearance_was_p1 = was_p1[order]
+        self.appearance_won = won[order]
+
+        counts = np.bincount(fighters, minlength=len(self.fighter_names))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    def save(self, directory) -> Dict:
+        """Write every column as a .npy file under directory; returns metadata for the cache manifest."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in FIGHT_COLUMNS + INDEX_COLUMNS:
+            np.save(directory / f'{name}.npy', np.ascontiguousarray(getattr(self, name)))
+        np.save(directory / 'fighter_names.npy', np.array(self.fighter_names))
+        return {
+            'method_categories': self.method_categories,
+            'n_source_columns': self.n_source_columns
+        }
+
+    @classmethod
+    def load(cls, directory, metadata: Dict, mmap: bool = True) -> 'FightStore':
+        """Open a store written by save(); columns are memory-mapped read-only unless mmap=False."""
+        directory = Path(directory)
+        mmap_mode = 'r' if mmap else None
+
+        def column(name):
+            return np.load(directory / f'{name}.npy', mmap_mode=mmap_mode, allow_pickle=False)
+
+        return cls(
+            fighter_names=column('fighter_names').tolist(),
+            method_categories=metadata['method_categories'],
+            n_source_columns=metadata['n_source_columns'],
+            index={name: column(name) for name in INDEX_COLUMNS},
+            **{name: column(name) for name in FIGHT_COLUMNS}
+        )
+
+    @property
+    def n_fights(self) -> int:
+        return len(self.event_days)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Shape of the source CSV, for status endpoints."""
+        return self.n_fights, self.n_source_columns
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the numpy columns (fighter name strings excluded)."""
+        arrays = [
+            self.p1_ids, self.p2_ids, self.event_days, self.winner, self.method_codes,
+            self.p1_stats, self.p2_stats, self.offsets, self.appearance_rows,
+            self.appearance_days, self.appearance_was_p1, self.appearance_won
+        ]
+        return sum(a.nbytes for a in arrays)
+
+    def appearances(self, fighter_name) -> Optional[slice]:
+        """Slice of the appearance arrays for a fighter, or None if they never fought."""
+        fighter = self.fighter_ids.get(fighter_name)
+        if fighter is None:
+            return None
+        return slice(self.offsets[fighter], self.offsets[fighter + 1])
+
+    def count_before(self, fighter_name, event_date=None) -> int:
+        """Number of a fighter's bouts strictly before event_date (all bouts if None)."""
+        span = self.appearances(fighter_name)
+        if span is None:
+            return 0
+        if event_date is None:
+            return span.stop - span.start
+        # A bout on the event's own day counts as prior only if the event has a time past midnight
+        cutoff = to_day_number(event_date, ceil=True)
+        return int(np.searchsorted(self.appearance_days[span], cutoff, side='left'))
+
+    def recent_stats(self, fighter_name, prior_count: int, n: int = 3) -> np.ndarray:
+        """The fighter's own stat rows for their last n bouts before prior_count, most recent first."""
+        span = self.appearances(fighter_name)
+        picks = np.arange(span.start + prior_count - 1, span.start + max(prior_count - n, 0) - 1, -1)
+        rows = self.appearance_rows[picks]
+        return np.where(
+            self.appearance_was_p1[picks, np.newaxis],
+            self.p1_stats[rows],
+            self.p2_stats[rows]
+        )
+
+    def method_win_counts(self, fighter_name) -> Dict[str, int]:
+        """Career wins per METHOD_GROUPS entry."""
+        span = self.appearances(fighter_name)
+        if span is None:
+            return {method: 0 for method in METHOD_GROUPS}
+        won_rows = self.appearance_rows[span][self.appearance_won[span]]
+        codes = self.method_codes[won_rows]
+        groups = self.method_group_codes[codes[codes >= 0]]
+        counts = np.bincount(groups[groups >= 0], minlength=len(METHOD_GROUPS))
+        return {method: int(count) for method, count in zip(METHOD_GROUPS, counts)}
@@ -1,71 +1,170 @@
 # globals.py
-from typing import Optional, Dict
+from typing import TYPE_CHECKING, Any, Optional, Dict
 import pandas as pd
-import xgboost as xgb
+from app.core.fight_store import FightStore
+from app.services.result_cache import get_prediction_result_cache
 
-# Global variables to store models and datasets
-_models: Optional[Dict[str, xgb.XGBClassifier]] = None
-_datasets: Optional[Dict[str, pd.DataFrame]] = None
-_cached_data: Optional[Dict] = None
+if TYPE_CHECKING:
+    # Annotations only; xgboost (and sklearn/scipy behind it) load with the models
+    import xgboost as xgb
 
-def set_models(models: Dict[str, xgb.XGBClassifier]) -> None:
+class PredictionState:
+    """
+    Models, datasets and derived indexes for one version of the artifacts.
+
+    Startup and reloads fill a fresh state and install it with
+    set_prediction_state, a single reference swap. A request that already
+    holds the old predictor keeps reading the old state until it finishes.
+    """
+
+    def __init__(self):
+        self.models: Optional[Dict[str, 'xgb.XGBClassifier']] = None
+        self.model_digests: Dict[str, str] = {}
+        self.explainers: Dict[str, Any] = {}
+        self.datasets: Optional[Dict[str, pd.DataFrame]] = None
+        self.dataset_digests: Dict[str, str] = {}
+        self.cached_data: Optional[Dict] = None
+        self.fight_store: Optional[FightStore] = None
+        self.fighter_snapshots: Optional[Any] = None
+        self.predictor: Optional[Any] = None
+
+    def get_models(self) -> Dict[str, 'xgb.XGBClassifier']:
+        if self.models is None:
+            raise RuntimeError("Models not loaded. Ensure startup completed successfully.")
+        return self.models
+
+    def get_model(self, model_name: str = 'main') -> 'xgb.XGBClassifier':
+        models = self.get_models()
+        if model_name not in models:
+            available = list(models.keys())
+            raise ValueError(f"Model '{model_name}' not found. Available models: {available}")
+        return models[model_name]
+
+    def set_datasets(self, datasets: Dict[str, pd.DataFrame]) -> None:
+        """Prepare freshly read CSVs; the fight table is kept only as a FightStore."""
+        self.datasets = {name: df for name, df in datasets.items() if name != 'ufc_data'}
+        
+        # Initialize caches like in your original code
+        if 'ufc_data' in datasets and 'fighters' in datasets:
+            cleaned_df = datasets['ufc_data']
+            fighters_df = datasets['fighters']
+            
+            # Convert date columns and create caches
+            fighters_df['dob'] = pd.to_datetime(fighters_df['dob'])
+            
+            self.set_dataset_state(
+                FightStore.from_dataframe(cleaned_df),
+                fighters_df,
+                cleaned_df['referee'].value_counts().to_dict()
+            )
+
+    def set_dataset_state(self, fight_store: FightStore, fighters_df: pd.DataFrame, referee_counts: Dict[str, int]) -> None:
+        """Set the prepared datasets and rebuild the lookups derived from them."""
+        self.datasets = dict(self.datasets or {}, fighters=fighters_df)
+        self.fight_store = fight_store
+        self.cached_data = {
+            'referee_counts_cache': referee_counts,
+            'fighter_lookup': build_fighter_lookup(fighters_df)
+        }
+
+    def get_fight_store(self) -> FightStore:
+        if self.fight_store is None:
+            raise RuntimeError("Fight store not available. Ensure datasets loaded successfully.")
+        return self.fight_store
+
+    def get_datasets(self) -> Dict[str, pd.DataFrame]:
+        if self.datasets is None:
+            raise RuntimeError("Datasets not loaded. Ensure startup completed successfully.")
+        return self.datasets
+
+    def get_dataset(self, dataset_name: str = 'ufc_data') -> pd.DataFrame:
+        datasets = self.get_datasets()
+        if dataset_name not in datasets:
+            available = list(datasets.keys())
+            raise ValueError(f"Dataset '{dataset_name}' not found. Available datasets: {available}")
+        return datasets[dataset_name]
+
+    def get_cached_data(self) -> Dict:
+        if self.cached_data is None:
+            raise RuntimeError("Cached data not available. Ensure datasets loaded successfully.")
+        return self.cached_data
+
+# The installed state; the module-level accessors below read and fill this one
+_state = PredictionState()
+_startup_complete: bool = False
+
+def set_prediction_state(state: PredictionState) -> None:
+    """Install a fully loaded state (with its predictor) in one assignment."""
+    global _state
+    _state = state
+    # Cache results for this state only; requests still running on the old one bypass the cache
+    get_prediction_result_cache().set_fingerprint(getattr(state.predictor, 'state_fingerprint', None))
+
+def get_prediction_state() -> PredictionState:
+    """Get the installed state."""
+    return _state
+
+def set_startup_complete(complete: bool = True) -> None:
+    """Mark that the lifespan has finished loading models and datasets (successfully or not)."""
+    global _startup_complete
+    _startup_complete = complete
+
+def is_startup_complete() -> bool:
+    """Whether model and dataset loading has finished."""
+    return _startup_complete
+
+def get_predictor() -> Optional[Any]:
+    """Get the predictor service for the installed state, if one was built."""
+    return _state.predictor
+
+def set_models(models: Dict[str, 'xgb.XGBClassifier']) -> None:
     """Set the global models dictionary."""
-    global _models
-    _models = models
+    _state.models = models
 
-def get_models() -> Dict[str, xgb.XGBClassifier]:
+def get_models() -> Dict[str, 'xgb.XGBClassifier']:
     """Get the global models dictionary."""
-    if _models is None:
-        raise RuntimeError("Models not loaded. Ensure startup completed successfully.")
-    return _models
+    return _state.get_models()
 
-def get_model(model_name: str = 'main') -> xgb.XGBClassifier:
+def get_model(model_name: str = 'main') -> 'xgb.XGBClassifier':
     """Get a specific model by name."""
-    models = get_models()
-    if model_name not in models:
-        available = list(models.keys())
-        raise ValueError(f"Model '{model_name}' not found. Available models: {available}")
-    return models[model_name]
+    return _state.get_model(model_name)
+
+def get_explainers() -> Dict[str, Any]:
+    """Get the global SHAP explainers (empty until startup builds them)."""
+    return _state.explainers
 
 def set_datasets(datasets: Dict[str, pd.DataFrame]) -> None:
-    """Set the global datasets dictionary and initialize caches."""
-    global _datasets, _cached_data
-    _datasets = datasets
-    
-    # Initialize caches like in your original code
-    if 'ufc_data' in datasets and 'fighters' in datasets:
-        cleaned_df = datasets['ufc_data']
-        fighters_df = datasets['fighters']
-        
-        # Convert date columns and create caches
-        cleaned_df['event_date'] = pd.to_datetime(cleaned_df['event_date'])
-        fighters_df['dob'] = pd.to_datetime(fighters_df['dob'])
-        
-        # Cache referee counts and fighter lookups
-        referee_counts_cache = cleaned_df['referee'].value_counts().to_dict()
-        fighter_lookup = fighters_df.drop_duplicates(subset=['name'], keep='last').set_index('name').to_dict('index')
-        
-        _cached_data = {
-            'referee_counts_cache': referee_counts_cache,
-            'fighter_lookup': fighter_lookup
-        }
+    """Set the global datasets from freshly read CSVs and initialize caches.
+
+    The fight table is converted to a FightStore and the DataFrame is not
+    kept; get_dataset('ufc_data') is no longer available after this call.
+    """
+    _state.set_datasets(datasets)
+
+def set_dataset_state(fight_store: FightStore, fighters_df: pd.DataFrame, referee_counts: Dict[str, int]) -> None:
+    """Set the prepared datasets, from CSV via set_datasets or from the binary dataset cache."""
+    _state.set_dataset_state(fight_store, fighters_df, referee_counts)
+
+def build_fighter_lookup(fighters_df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """Name -> row dict (last row wins for duplicate names), same values as to_dict('index')."""
+    unique = fighters_df.drop_duplicates(subset=['name'], keep='last').set_index('name')
+    columns = list(unique.columns)
+    # Convert column-wise, then zip rows, instead of building a dict per row through pandas
+    values = [unique[col].tolist() for col in columns]
+    return {name: dict(zip(columns, row)) for name, row in zip(unique.index, zip(*values))}
+
+def get_fight_store() -> FightStore:
+    """Get the column-oriented fight history store."""
+    return _state.get_fight_store()
 
 def get_datasets() -> Dict[str, pd.DataFrame]:
     """Get the global datasets dictionary."""
-    if _datasets is None:
-        raise RuntimeError("Datasets not loaded. Ensure startup completed successfully.")
-    return _datasets
+    return _state.get_datasets()
 
 def get_dataset(dataset_name: str = 'ufc_data') -> pd.DataFrame:
     """Get a specific dataset by name."""
-    datasets = get_datasets()
-    if dataset_name not in datasets:
-        available = list(datasets.keys())
-        raise ValueError(f"Dataset '{dataset_name}' not found. Available datasets: {available}")
-    return datasets[dataset_name]
+    return _state.get_dataset(dataset_name)
 
 def get_cached_data() -> Dict:
     """Get cached lookup data."""
-    if _cached_data is None:
-        raise RuntimeError("Cached data not available. Ensure datasets loaded successfully.")
-    return _cached_data
+    return _state.get_cached_data()
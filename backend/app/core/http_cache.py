@@ -0,0 +1,22 @@
+# http_cache.py
+import hashlib
+from typing import Optional
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the parts that fully determine a response body."""
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(str(part).encode() + b'\0')
+    return f'"{hasher.hexdigest()[:32]}"'
+
+def is_not_modified(etag: str, if_none_match: Optional[str]) -> bool:
+    """
+    Whether a GET can be answered with 304. Only If-None-Match is honoured:
+    these responses send no Last-Modified, since deleting an event changes
+    the body without moving any timestamp an If-Modified-Since could compare.
+    """
+    if if_none_match is None:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    return '*' in candidates or etag in [tag[2:] if tag.startswith('W/') else tag for tag in candidates]
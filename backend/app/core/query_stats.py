@@ -0,0 +1,64 @@
+# query_stats.py
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class QueryStats:
+    """Statements executed and time spent in the database during one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'
+
+# The stats object is shared by reference, so statements run from the
+# threadpool (sync dependencies) are counted on the request that started them
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar('query_stats', default=None)
+_instrumented_engines = set()
+
+@contextmanager
+def track_queries():
+    """Count every statement executed inside the block (in this context) into a QueryStats."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+def instrument_engine(engine: Engine) -> None:
+    """Hook the cursor execute events of engine; statements outside track_queries are ignored."""
+    if id(engine) in _instrumented_engines:
+        return
+    _instrumented_engines.add(id(engine))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_stats.get() is not None:
+            conn.info.setdefault('query_start_times', []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        start_times = conn.info.get('query_start_times')
+        if stats is None or not start_times:
+            return
+        stats.count += 1
+        stats.seconds += time.perf_counter() - start_times.pop()
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        # A failed statement never reaches after_cursor_execute; still count its time
+        conn = exception_context.connection
+        stats = _current_stats.get()
+        start_times = conn.info.get('query_start_times') if conn is not None else None
+        if stats is None or not start_times:
+            return
+        stats.count += 1
+        stats.seconds += time.perf_counter() - start_times.pop()
@@ -0,0 +1,59 @@
+# revocations.py
+import asyncio
+import time
+from typing import FrozenSet, Optional
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from database import AsyncSessionLocal
+from models import User
+
+class RevokedUsers:
+    """
+    Users whose still-valid access tokens must be refused: deactivated users
+    (is_active false in the database, re-read at most every refresh_seconds).
+
+    Checking a token costs a set lookup; only the periodic refresh touches
+    the database, so a deactivation takes up to refresh_seconds to apply.
+    Tokens of a user whose row was deleted stay valid until they expire.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._inactive: FrozenSet[int] = frozenset()
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    async def is_revoked(self, user_id: int) -> bool:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            await self.refresh()
+        return user_id in self._inactive
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            # Another request may have refreshed while this one waited
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at <= self.refresh_seconds:
+                return
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await db.execute(select(User.id).where(User.is_active.is_(False)))
+                    self._inactive = frozenset(result.scalars().all())
+                self.refreshes += 1
+            except Exception as e:
+                # Keep the last known set; retry after the next interval rather than per request
+                self.refresh_errors += 1
+                print(f"Could not refresh deactivated users, keeping the previous list: {type(e).__name__}: {e}")
+            self._loaded_at = time.monotonic()
+
+_revoked_users: Optional[RevokedUsers] = None
+
+def get_revoked_users() -> RevokedUsers:
+    """Get the process-wide revoked users cache, creating it on first use."""
+    global _revoked_users
+    if _revoked_users is None:
+        _revoked_users = RevokedUsers(settings.auth_revocation_refresh_seconds)
+    return _revoked_users
@@ -0,0 +1,63 @@
+# admin.py
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Dict, Any
+
+from app.core.auth_dependencies import get_current_user
+from app.core.config import settings
+from app.core.globals import get_predictor
+from app.services.public_events_cache import get_public_events_cache
+from app.services.state_loader import ReloadInProgress, get_load_status, reload_prediction_state
+
+def require_admin(current_user = Depends(get_current_user)):
+    """Only users listed in settings.admin_usernames may call admin endpoints."""
+    if current_user.username not in settings.admin_usernames:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.post("/reload", response_model=Dict[str, Any])
+async def reload_models():
+    """
+    Load the model and dataset files from disk again and swap them in.
+    Predictions keep being served from the current models until the swap.
+    """
+    try:
+        result = await asyncio.to_thread(reload_prediction_state)
+        return {"success": True, "data": result}
+
+    except ReloadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        predictor = get_predictor()
+        serving = predictor.model_version if predictor is not None else None
+        print(f"Reload failed: {type(e).__name__}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Reload failed, still serving model version {serving}: {str(e)}"
+        )
+
+@router.get("/reload/status", response_model=Dict[str, Any])
+async def reload_status():
+    """Model version being served and the outcome of the last load."""
+    predictor = get_predictor()
+    return {
+        "success": True,
+        "data": {
+            "model_version": predictor.model_version if predictor is not None else None,
+            "loaded_at": predictor.loaded_at if predictor is not None else None,
+            **get_load_status()
+        }
+    }
+
+@router.get("/public-events-cache", response_model=Dict[str, Any])
+async def public_events_cache_status():
+    """Size and hit counters of the materialized /public-events pages."""
+    return {
+        "success": True,
+        "data": {
+            "enabled": settings.public_events_cache_enabled,
+            **get_public_events_cache().stats()
+        }
+    }
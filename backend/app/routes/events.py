@@ -1,15 +1,24 @@
 # app/routes/events.py
-from fastapi import APIRouter, HTTPException, Depends
+import base64
+import uuid
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.orm.attributes import flag_modified
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 from datetime import date, datetime
 
-from database import get_db
-from models import Event, Match, User
-from app.core.auth_dependencies import get_current_user
+from database import get_async_db
+from models import Event, Match
+from app.core.auth_dependencies import TokenUser, get_current_user
+from app.core.config import settings
+from app.core.http_cache import is_not_modified, make_etag
+from app.services.public_events_cache import (
+    choose_encoding, encode_events_cursor, get_public_events_cache, serialize_public_event
+)
 
 router = APIRouter()
 
@@ -40,8 +49,8 @@ class MatchUpdate(BaseModel):
 # Event endpoints - NO response_model declarations
 @router.get("/events")
 async def get_events(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all events for the current user."""
     try:
@@ -49,9 +58,12 @@ async def get_events(
         print(f"User ID: {current_user.id}")
         
         # Use selectinload to eagerly load matches
-        events = db.query(Event).options(selectinload(Event.matches)).filter(
-            Event.user_id == current_user.id
-        ).order_by(Event.date.desc()).all()
+        result = await db.execute(
+            select(Event).options(selectinload(Event.matches)).where(
+                Event.user_id == current_user.id
+            ).order_by(Event.date.desc())
+        )
+        events = result.scalars().all()
         
         print(f"Found {len(events)} events")
         
@@ -126,8 +138,8 @@ async def get_events(
 @router.post("/events")
 async def create_event(
     event_data: EventCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new event."""
     try:
@@ -138,8 +150,9 @@ async def create_event(
             user_id=current_user.id
         )
         db.add(db_event)
-        db.commit()
-        db.refresh(db_event)
+        await db.commit()
+        await db.refresh(db_event)
+        await refresh_public_event(db, db_event.id)
         
         # Return structured response with empty matches array
         return {
@@ -152,23 +165,26 @@ async def create_event(
         }
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error creating event: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to create event: {str(e)}")
 
 @router.put("/events/{event_id}")
 async def update_event(
-    event_id: str,
+    event_id: uuid.UUID,
     event_data: EventUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update an event."""
     try:
-        db_event = db.query(Event).options(selectinload(Event.matches)).filter(
-            Event.id == event_id,
-            Event.user_id == current_user.id
-        ).first()
+        result = await db.execute(
+            select(Event).options(selectinload(Event.matches)).where(
+                Event.id == event_id,
+                Event.user_id == current_user.id
+            )
+        )
+        db_event = result.scalars().first()
         
         if not db_event:
             raise HTTPException(status_code=404, detail="Event not found")
@@ -178,8 +194,9 @@ async def update_event(
         db_event.location = event_data.location  # NEW FIELD
         db_event.updated_at = datetime.utcnow()
         
-        db.commit()
-        db.refresh(db_event)
+        await db.commit()
+        await db.refresh(db_event, attribute_names=['name', 'date', 'location', 'created_at'])
+        await refresh_public_event(db, db_event.id)
         
         # Return structured response with matches
         return {
@@ -209,45 +226,51 @@ async def update_event(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error updating event: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to update event: {str(e)}")
 
 @router.delete("/events/{event_id}")
 async def delete_event(
-    event_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    event_id: uuid.UUID,
+    current_user: TokenUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete an event and all its matches."""
     try:
-        db_event = db.query(Event).filter(
-            Event.id == event_id,
-            Event.user_id == current_user.id
-        ).first()
+        # The matches are deleted with the event, so load them in the same query
+        result = await db.execute(
+            select(Event).options(joinedload(Event.matches)).where(
+                Event.id == event_id,
+                Event.user_id == current_user.id
+            )
+        )
+        db_event = result.unique().scalars().first()
         
         if not db_event:
             raise HTTPException(status_code=404, detail="Event not found")
         
-        db.delete(db_event)
-        db.commit()
+        deleted_event_id = db_event.id
+        await db.delete(db_event)
+        await db.commit()
+        await refresh_public_event(db, deleted_event_id, deleted=True)
         
         return {"message": "Event deleted successfully"}
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error deleting event: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to delete event: {str(e)}")
 
 # Match endpoints
 @router.post("/events/{event_id}/matches")
 async def create_match(
-    event_id: str,
+    event_id: uuid.UUID,
     match_data: MatchCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new match for an event."""
     try:
@@ -258,10 +281,13 @@ async def create_match(
         print(f"Prediction data received: {match_data.prediction_data}")
         
         # Verify event exists and belongs to user
-        db_event = db.query(Event).filter(
-            Event.id == event_id,
-            Event.user_id == current_user.id
-        ).first()
+        result = await db.execute(
+            select(Event).where(
+                Event.id == event_id,
+                Event.user_id == current_user.id
+            )
+        )
+        db_event = result.scalars().first()
         
         if not db_event:
             raise HTTPException(status_code=404, detail="Event not found")
@@ -298,8 +324,9 @@ async def create_match(
         
         # Add to database
         db.add(db_match)
-        db.commit()
-        db.refresh(db_match)
+        await db.commit()
+        await db.refresh(db_match)
+        await refresh_public_event(db, db_match.event_id)
         
         print(f"Database match object after save: {db_match}")
         print(f"Saved prediction data: {db_match.prediction_data}")
@@ -326,7 +353,7 @@ async def create_match(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error creating match: {type(e).__name__}: {e}")
         import traceback
         traceback.print_exc()
@@ -334,18 +361,21 @@ async def create_match(
 
 @router.put("/matches/{match_id}")
 async def update_match_result(
-    match_id: str,
+    match_id: uuid.UUID,
     match_data: MatchUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update match result."""
     try:
         # Find match and verify it belongs to user
-        db_match = db.query(Match).join(Event).filter(
-            Match.id == match_id,
-            Event.user_id == current_user.id
-        ).first()
+        result = await db.execute(
+            select(Match).join(Event).where(
+                Match.id == match_id,
+                Event.user_id == current_user.id
+            )
+        )
+        db_match = result.scalars().first()
         
         if not db_match:
             raise HTTPException(status_code=404, detail="Match not found")
@@ -356,8 +386,9 @@ async def update_match_result(
         db_match.result = match_data.result
         db_match.updated_at = datetime.utcnow()
         
-        db.commit()
-        db.refresh(db_match)
+        await db.commit()
+        await db.refresh(db_match)
+        await refresh_public_event(db, db_match.event_id)
         
         # Return structured response
         return {
@@ -377,73 +408,165 @@ async def update_match_result(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error updating match result: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to update match result: {str(e)}")
 
 @router.delete("/matches/{match_id}")
 async def delete_match(
-    match_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    match_id: uuid.UUID,
+    current_user: TokenUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a match."""
     try:
         # Find match and verify it belongs to user
-        db_match = db.query(Match).join(Event).filter(
-            Match.id == match_id,
-            Event.user_id == current_user.id
-        ).first()
+        result = await db.execute(
+            select(Match).join(Event).where(
+                Match.id == match_id,
+                Event.user_id == current_user.id
+            )
+        )
+        db_match = result.scalars().first()
         
         if not db_match:
             raise HTTPException(status_code=404, detail="Match not found")
         
-        db.delete(db_match)
-        db.commit()
+        match_event_id = db_match.event_id
+        await db.delete(db_match)
+        await db.commit()
+        await refresh_public_event(db, match_event_id)
         
         return {"message": "Match deleted successfully"}
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error deleting match: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to delete match: {str(e)}")
 
+def decode_events_cursor(cursor: str):
+    """(date, UUID) from encode_events_cursor, or a 400 for anything else."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        event_date, event_id = raw.split('|')
+        return date.fromisoformat(event_date), uuid.UUID(event_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def public_events_fingerprint(db: AsyncSession):
+    """
+    Fingerprint of everything /public-events can show, from two aggregate
+    queries. Counts catch deletions, which leave max(updated_at) alone.
+    """
+    events_updated, events_count = (await db.execute(select(func.max(Event.updated_at), func.count(Event.id)))).one()
+    matches_updated, matches_count = (await db.execute(select(func.max(Match.updated_at), func.count(Match.id)))).one()
+    return events_updated, events_count, matches_updated, matches_count
+
+async def refresh_public_event(db: AsyncSession, event_id, deleted: bool = False):
+    """
+    Bring the public events cache up to date after a committed write to an
+    event or one of its matches. A failure here must not fail the write, so
+    it only drops the snapshot to be rebuilt on the next read.
+    """
+    if not settings.public_events_cache_enabled:
+        return
+    try:
+        cache = get_public_events_cache()
+    except Exception as e:
+        # Reads fall back to the database while the cache cannot be built
+        print(f"Public events cache unavailable, skipping update: {type(e).__name__}: {e}")
+        return
+    try:
+        if deleted:
+            await cache.event_deleted(event_id)
+        else:
+            await cache.event_changed(db, event_id)
+    except Exception as e:
+        print(f"Public events cache update failed, rebuilding on next read: {type(e).__name__}: {e}")
+        try:
+            await cache.invalidate()
+        except Exception:
+            pass
+
+async def cached_public_events_response(request: Request, db: AsyncSession, limit: int, after,
+                                        include_predictions: bool) -> Response:
+    """A /public-events page straight from the cache, compressed as the client accepts."""
+    page = await get_public_events_cache().get_page(db, limit, after, include_predictions)
+    encoding = choose_encoding(request.headers.get('accept-encoding'))
+    
+    headers = {'ETag': page.etag_for(encoding), 'Cache-Control': 'public, no-cache', 'Vary': 'Accept-Encoding'}
+    if page.next_cursor is not None:
+        headers['X-Next-Cursor'] = page.next_cursor
+    
+    if is_not_modified(headers['ETag'], request.headers.get('if-none-match')):
+        return Response(status_code=304, headers=headers)
+    
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+    return Response(content=page.encoded(encoding), media_type='application/json', headers=headers)
+
 @router.get("/public-events")
-async def get_public_events(db: Session = Depends(get_db)):
+async def get_public_events(
+    request: Request,
+    response: Response,
+    limit: int = Query(settings.public_events_page_size, ge=1, le=settings.public_events_max_page_size),
+    cursor: Optional[str] = None,
+    include_predictions: bool = True,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Public endpoint: Get all events and matches for public display (no auth required).
+    Public endpoint: events and matches for public display (no auth required), newest first.
+
+    Pages are keyed on (date, id): pass the X-Next-Cursor header of one page
+    as ?cursor= to get the next; the last page has no X-Next-Cursor. With
+    include_predictions=false, matches omit prediction_data. Responses carry
+    an ETag, and a request with a matching If-None-Match gets 304 after two
+    aggregate queries instead of loading any events.
+    
+    With public_events_cache_enabled, pages come pre-serialized and
+    pre-compressed from memory and a 304 needs no query at all; the database
+    path below is used when the cache is off or fails.
     """
     try:
-        events = db.query(Event).options(selectinload(Event.matches)).order_by(Event.date.desc()).all()
-        events_data = []
-        for event in events:
-            matches_data = []
-            for match in (event.matches or []):
-                match_dict = {
-                    'id': str(match.id),
-                    'fighter1': match.fighter1,
-                    'fighter2': match.fighter2,
-                    'odds1': match.odds1,
-                    'odds2': match.odds2,
-                    'referee': match.referee,
-                    'weightclass': match.weightclass,
-                    'event_date': f"{match.event_date.isoformat()}T00:00:00Z",
-                    'result': match.result,
-                    'prediction_data': match.prediction_data,
-                    'created_at': match.created_at.isoformat()
-                }
-                matches_data.append(match_dict)
-            event_dict = {
-                'id': str(event.id),
-                'name': event.name,
-                'date': event.date.isoformat(),
-                'location': event.location,
-                'created_at': event.created_at.isoformat(),
-                'matches': matches_data
-            }
-            events_data.append(event_dict)
-        return events_data
+        after = decode_events_cursor(cursor) if cursor else None
+        
+        if settings.public_events_cache_enabled:
+            try:
+                return await cached_public_events_response(request, db, limit, after, include_predictions)
+            except Exception as e:
+                print(f"Public events cache unavailable, reading from the database: {type(e).__name__}: {e}")
+        
+        fingerprint = await public_events_fingerprint(db)
+        etag = make_etag('public-events', *fingerprint, limit, cursor, include_predictions)
+        headers = {'ETag': etag, 'Cache-Control': 'public, no-cache'}
+        
+        if is_not_modified(etag, request.headers.get('if-none-match')):
+            return Response(status_code=304, headers=headers)
+        
+        matches_loader = selectinload(Event.matches)
+        if not include_predictions:
+            matches_loader = matches_loader.defer(Match.prediction_data)
+        
+        query = select(Event).options(matches_loader)
+        if after is not None:
+            after_date, after_id = after
+            query = query.where(or_(
+                Event.date < after_date,
+                and_(Event.date == after_date, Event.id < after_id)
+            ))
+        # One extra row tells whether there is a next page
+        result = await db.execute(query.order_by(Event.date.desc(), Event.id.desc()).limit(limit + 1))
+        events = result.scalars().all()
+        
+        if len(events) > limit:
+            events = events[:limit]
+            headers['X-Next-Cursor'] = encode_events_cursor(events[-1].date, events[-1].id)
+        response.headers.update(headers)
+        
+        return [serialize_public_event(event, include_predictions) for event in events]
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch public events: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to fetch public events: {str(e)}")
@@ -10,17 +10,21 @@ async def health_check():
 @router.get("/model/info")
 async def model_info():
     """Get information about the loaded model."""
-    from app.core.globals import get_model, get_dataset
+    from app.core.globals import get_model, get_fight_store, get_explainers
+    from app.core.config import settings
     
     try:
         model = get_model()
-        dataset = get_dataset()
+        fight_store = get_fight_store()
         
         return {
             "model_loaded": True,
             "dataset_loaded": True,
-            "dataset_shape": dataset.shape,
-            "model_type": type(model).__name__
+            "dataset_shape": fight_store.shape,
+            "model_type": type(model).__name__,
+            "shap_backend": settings.shap_backend,
+            "shap_explainers_warm": settings.shap_backend == 'native' or 'main' in get_explainers(),
+            "shap_explainers": list(get_explainers().keys())
         }
     except Exception as e:
         return {
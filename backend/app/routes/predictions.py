@@ -5,11 +5,36 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 import pandas as pd
 from app.services.predictor import UFCPredictor
+from app.services.result_cache import get_prediction_result_cache
+from app.services.shap_cache import get_shap_image_cache
+from app.services.shap_renderer import get_shap_render_pool
+from app.core.config import settings
+from app.core.executor import get_prediction_executor, ExecutorSaturated
+from app.core.globals import is_startup_complete, get_predictor
 
 # Import from the new auth dependencies module instead of main
 from app.core.auth_dependencies import get_current_user
 
-router = APIRouter()
+def require_startup_complete():
+    """Answer 503 while models and datasets are still loading in the background."""
+    if not is_startup_complete():
+        raise HTTPException(
+            status_code=503,
+            detail="Models are still loading, try again shortly",
+            headers={"Retry-After": str(settings.prediction_retry_after_seconds)}
+        )
+
+def get_predictor_service() -> UFCPredictor:
+    """
+    The predictor for the installed models and datasets. A request keeps the
+    one it got here even if a reload swaps in a new one while it runs.
+    """
+    predictor = get_predictor()
+    if predictor is None:
+        raise HTTPException(status_code=503, detail="Prediction service is not available")
+    return predictor
+
+router = APIRouter(dependencies=[Depends(require_startup_complete)])
 
 class PredictionRequest(BaseModel):
     fighter_1: str
@@ -17,6 +42,18 @@ class PredictionRequest(BaseModel):
     event_date: str  # Format: 'YYYY-MM-DD'
     referee: str
     prediction_type: str = 'winner'  # 'winner' or 'method'
+    shap_format: str = 'png'  # 'png', 'json' or 'none'
+
+class BatchMatchup(BaseModel):
+    fighter_1: str
+    fighter_2: str
+    event_date: str  # Format: 'YYYY-MM-DD'
+    referee: str
+    prediction_type: str = 'winner'  # 'winner' or 'method'
+
+class BatchPredictionRequest(BaseModel):
+    matchups: List[BatchMatchup]
+    shap_format: str = 'none'  # 'json' or 'none'; render PNGs per bout via /predict-with-shap
 
 class MatchResultUpdate(BaseModel):
     match_id: str
@@ -54,7 +91,8 @@ async def update_match_result(
 @router.post("/predict-with-shap", response_model=Dict[str, Any])
 async def predict_fight_with_shap(
     request: PredictionRequest,
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_user),
+    predictor: UFCPredictor = Depends(get_predictor_service)
 ):
     """
     Predict UFC fight outcome with SHAP visualization.
@@ -67,8 +105,7 @@ async def predict_fight_with_shap(
         print(f"Event date: '{request.event_date}'")
         print(f"Referee: '{request.referee}'")
         print(f"Prediction type: '{request.prediction_type}'")
-        
-        predictor = UFCPredictor()
+        print(f"SHAP format: '{request.shap_format}'")
         
         # Check if fighters exist BEFORE making prediction
         print("Checking if fighters exist in database...")
@@ -93,6 +130,13 @@ async def predict_fight_with_shap(
                 detail=f"prediction_type must be 'winner' or 'method', got: {request.prediction_type}"
             )
         
+        # Validate SHAP format
+        if request.shap_format not in ['png', 'json', 'none']:
+            raise HTTPException(
+                status_code=400,
+                detail=f"shap_format must be 'png', 'json' or 'none', got: {request.shap_format}"
+            )
+        
         # Validate date format
         try:
             parsed_date = datetime.strptime(request.event_date, '%Y-%m-%d')
@@ -114,18 +158,30 @@ async def predict_fight_with_shap(
         
         print("All validations passed, making prediction...")
         
-        # Make prediction with SHAP visualization
-        result = predictor.combined_predict_with_shap(
-            p1=request.fighter_1,
-            p2=request.fighter_2,
-            eventDate=request.event_date,
-            ref=request.referee,
-            prediction_type=request.prediction_type
-        )
+        # Make prediction with SHAP visualization on the worker pool so the
+        # event loop keeps serving other requests
+        try:
+            result, timings = await get_prediction_executor().run(
+                predictor.combined_predict_with_shap,
+                p1=request.fighter_1,
+                p2=request.fighter_2,
+                eventDate=request.event_date,
+                ref=request.referee,
+                prediction_type=request.prediction_type,
+                shap_format=request.shap_format
+            )
+        except ExecutorSaturated as e:
+            raise HTTPException(
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": str(settings.prediction_retry_after_seconds)}
+            )
         
-        print("Prediction successful!")
-        return {"success": True, "data": result}
+        print(f"Prediction successful! Queue wait: {timings['queue_wait_ms']:.1f}ms, execution: {timings['execution_ms']:.1f}ms")
+        return {"success": True, "data": result, "model_version": predictor.model_version, "timings": timings}
         
+    except HTTPException:
+        raise
     except ValueError as e:
         print(f"ValueError in prediction: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -135,15 +191,77 @@ async def predict_fight_with_shap(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+@router.post("/batch", response_model=Dict[str, Any])
+async def predict_fight_card(
+    request: BatchPredictionRequest,
+    current_user = Depends(get_current_user),
+    predictor: UFCPredictor = Depends(get_predictor_service)
+):
+    """
+    Predict every bout on a card in one request. Rows that fail are reported
+    individually without failing the batch.
+    """
+    try:
+        if not request.matchups:
+            raise HTTPException(status_code=400, detail="matchups cannot be empty")
+        if len(request.matchups) > settings.prediction_batch_max_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.prediction_batch_max_size} matchups per batch, got: {len(request.matchups)}"
+            )
+        if request.shap_format not in ['json', 'none']:
+            raise HTTPException(
+                status_code=400,
+                detail=f"shap_format must be 'json' or 'none' for batches, got: {request.shap_format}"
+            )
+        
+        matchups = []
+        for matchup in request.matchups:
+            matchups.append(matchup.model_dump())
+        
+        try:
+            results, timings = await get_prediction_executor().run(
+                predictor.batch_predict,
+                matchups,
+                shap_format=request.shap_format
+            )
+        except ExecutorSaturated as e:
+            raise HTTPException(
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": str(settings.prediction_retry_after_seconds)}
+            )
+        
+        failed = sum(1 for result in results if not result['success'])
+        print(f"Batch prediction: {len(results)} matchups, {failed} failed. Queue wait: {timings['queue_wait_ms']:.1f}ms, execution: {timings['execution_ms']:.1f}ms")
+        
+        return {
+            "success": True,
+            "data": {
+                "results": results,
+                "total": len(results),
+                "failed": failed
+            },
+            "model_version": predictor.model_version,
+            "timings": timings
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Unexpected error in batch prediction: {type(e).__name__}: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+
 @router.get("/fighter/{fighter_name}")
 async def get_fighter_info(
     fighter_name: str,
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_user),
+    predictor: UFCPredictor = Depends(get_predictor_service)
 ):
     """Get fighter information from the database."""
     try:
-        predictor = UFCPredictor()
-        
         try:
             fighter_data = predictor.get_fighter_data(fighter_name)
             
@@ -171,12 +289,11 @@ async def get_fighter_info(
 async def search_fighters(
     query: str,
     limit: int = 10,
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_user),
+    predictor: UFCPredictor = Depends(get_predictor_service)
 ):
     """Search for fighters by name."""
     try:
-        predictor = UFCPredictor()
-        
         # Get all fighter names
         all_fighters = list(predictor.fighter_lookup.keys())
         
@@ -199,11 +316,12 @@ async def search_fighters(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/referees")
-async def get_referees(current_user = Depends(get_current_user)):
+async def get_referees(
+    current_user = Depends(get_current_user),
+    predictor: UFCPredictor = Depends(get_predictor_service)
+):
     """Get list of referees and their frequency."""
     try:
-        predictor = UFCPredictor()
-        
         # Get top referees by frequency
         top_referees = dict(sorted(
             predictor.referee_counts_cache.items(), 
@@ -223,26 +341,33 @@ async def get_referees(current_user = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/models/status")
-async def get_model_status(current_user = Depends(get_current_user)):
+async def get_model_status(
+    current_user = Depends(get_current_user),
+    predictor: UFCPredictor = Depends(get_predictor_service)
+):
     """Get status of loaded models and datasets."""
     try:
-        predictor = UFCPredictor()
-        
         return {
             "success": True,
             "data": {
+                "model_version": predictor.model_version,
+                "loaded_at": predictor.loaded_at,
                 "models_loaded": {
                     "main_model": predictor.loaded_model is not None,
                     "p1_method_model": predictor.p1_model is not None,
                     "p2_method_model": predictor.p2_model is not None,
                 },
                 "datasets_loaded": {
-                    "ufc_data_rows": len(predictor.cleaned_df),
+                    "ufc_data_rows": predictor.fight_store.n_fights,
                     "fighters_count": len(predictor.fighters_df),
                     "cached_fighters": len(predictor.fighter_lookup),
                     "cached_referees": len(predictor.referee_counts_cache)
                 },
-                "shap_available": True
+                "shap_available": True,
+                "prediction_result_cache": get_prediction_result_cache().stats(),
+                "shap_image_cache": get_shap_image_cache().stats(),
+                "prediction_executor": get_prediction_executor().stats(),
+                "shap_render_pool": get_shap_render_pool().stats()
             }
         }
         
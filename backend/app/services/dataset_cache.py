@@ -0,0 +1,117 @@
+# dataset_cache.py
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.fight_store import FightStore
+from app.services.feature_snapshots import file_digest
+
+DATASET_CACHE_FORMAT_VERSION = 2  # 2: same-day appearances in descending row order
+MANIFEST_NAME = 'manifest.json'
+
+def source_digests(dataset_files: Dict[str, str]) -> Dict[str, str]:
+    """SHA-256 of each source CSV, keyed by dataset name."""
+    return {name: file_digest(path) for name, path in dataset_files.items()}
+
+def _save_fighters(fighters_df: pd.DataFrame, directory: Path) -> list:
+    # One .npy per column (names like 'Str. Acc.' are kept in the manifest, not in file names);
+    # text columns are stored as fixed-width unicode plus a null mask so no pickling is needed
+    directory.mkdir(parents=True, exist_ok=True)
+    columns = []
+    for i, col in enumerate(fighters_df.columns):
+        series = fighters_df[col]
+        if pd.api.types.is_datetime64_any_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            kind = 'array'
+            np.save(directory / f'{i}.npy', series.to_numpy())
+        else:
+            kind = 'text'
+            np.save(directory / f'{i}.npy', series.fillna('').to_numpy(dtype=str))
+            np.save(directory / f'{i}_null.npy', series.isna().to_numpy())
+        columns.append({'name': col, 'kind': kind, 'dtype': str(series.dtype)})
+    return columns
+
+def _load_fighters(directory: Path, columns: list) -> pd.DataFrame:
+    data = {}
+    for i, column in enumerate(columns):
+        values = np.load(directory / f'{i}.npy', allow_pickle=False)
+        if column['kind'] == 'text':
+            null = np.load(directory / f'{i}_null.npy', allow_pickle=False)
+            data[column['name']] = pd.Series(values, dtype=object).where(~null).astype(column['dtype'])
+        else:
+            data[column['name']] = values
+    return pd.DataFrame(data)
+
+def build_dataset_cache(dataset_files: Dict[str, str], cache_dir) -> Dict:
+    """
+    Read the CSVs once, prepare them exactly as set_datasets does and write
+    the results under cache_dir with a manifest of the source digests.
+    Returns the manifest.
+    """
+    cache_dir = Path(cache_dir)
+    digests = source_digests(dataset_files)
+    cleaned_df = pd.read_csv(dataset_files['ufc_data'])
+    fighters_df = pd.read_csv(dataset_files['fighters'])
+    fighters_df['dob'] = pd.to_datetime(fighters_df['dob'])
+    referee_counts = cleaned_df['referee'].value_counts()
+
+    # Build next to the live cache and swap it in, so a running reader never sees a partial cache
+    tmp_dir = cache_dir.with_name(cache_dir.name + '.tmp')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    fight_store_meta = FightStore.from_dataframe(cleaned_df).save(tmp_dir / 'fight_store')
+    fighter_columns = _save_fighters(fighters_df, tmp_dir / 'fighters')
+    np.save(tmp_dir / 'referee_names.npy', referee_counts.index.to_numpy(dtype=str))
+    np.save(tmp_dir / 'referee_counts.npy', referee_counts.to_numpy(dtype=np.int64))
+
+    manifest = {
+        'format_version': DATASET_CACHE_FORMAT_VERSION,
+        'sources': {
+            name: {'path': str(path), 'sha256': digests[name]}
+            for name, path in dataset_files.items()
+        },
+        'fight_store': fight_store_meta,
+        'fighters': {'rows': len(fighters_df), 'columns': fighter_columns}
+    }
+    (tmp_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    tmp_dir.rename(cache_dir)
+    return manifest
+
+def load_dataset_cache(cache_dir, digests: Dict[str, str]) -> Optional[Tuple[FightStore, pd.DataFrame, Dict[str, int]]]:
+    """
+    Open the binary dataset cache if it was built from CSVs with these digests.
+    Returns (fight_store, fighters_df, referee_counts), or None to fall back to the CSVs.
+    """
+    cache_dir = Path(cache_dir)
+    manifest_path = cache_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        print(f"No dataset cache at {cache_dir}; reading CSVs")
+        return None
+
+    try:
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get('format_version') != DATASET_CACHE_FORMAT_VERSION:
+            print(f"Dataset cache at {cache_dir} has format {manifest.get('format_version')}, "
+                  f"expected {DATASET_CACHE_FORMAT_VERSION}; reading CSVs")
+            return None
+
+        cached_digests = {name: source['sha256'] for name, source in manifest['sources'].items()}
+        if cached_digests != digests:
+            print(f"Dataset cache at {cache_dir} is stale (CSV changed); reading CSVs")
+            return None
+
+        fight_store = FightStore.load(cache_dir / 'fight_store', manifest['fight_store'])
+        fighters_df = _load_fighters(cache_dir / 'fighters', manifest['fighters']['columns'])
+        referee_names = np.load(cache_dir / 'referee_names.npy', allow_pickle=False).tolist()
+        referee_counts = np.load(cache_dir / 'referee_counts.npy', allow_pickle=False).tolist()
+    except Exception as e:
+        print(f"Could not load dataset cache from {cache_dir}: {e}")
+        return None
+
+    return fight_store, fighters_df, dict(zip(referee_names, referee_counts))
@@ -0,0 +1,50 @@
+# feature_layout.py
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+class FeatureLayout:
+    """
+    Fixed slot for every feature in the main model's input vector.
+
+    Slots follow the booster's feature order, so a filled row is the model
+    input as-is. Feature producers compile the names they emit once with
+    compile() and then write a whole group with one fancy-index assignment.
+    """
+
+    def __init__(self, feature_names: Sequence[str]):
+        self.names: List[str] = list(feature_names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.size = len(self.names)
+
+    def new_row(self) -> np.ndarray:
+        """A float32 input vector with every feature missing (NaN)."""
+        return np.full(self.size, np.nan, dtype=np.float32)
+
+    def compile(self, names: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map a producer's output names to (slots, positions): value positions[k]
+        of the producer goes to slot slots[k]. Names the model does not use
+        are dropped.
+        """
+        positions = [i for i, name in enumerate(names) if name in self.index]
+        slots = [self.index[names[i]] for i in positions]
+        return np.array(slots, dtype=np.intp), np.array(positions, dtype=np.intp)
+
+    def check_coverage(self, compiled_groups: Sequence[Tuple[np.ndarray, np.ndarray]]) -> None:
+        """
+        Raise ValueError unless the compiled groups write every slot. A model
+        feature no producer emits would otherwise stay NaN in every row.
+        """
+        covered = np.zeros(self.size, dtype=bool)
+        for slots, _ in compiled_groups:
+            covered[slots] = True
+        missing = [name for name, is_covered in zip(self.names, covered) if not is_covered]
+        if missing:
+            raise ValueError(f"No feature producer writes {len(missing)} of the model's features: {missing[:5]}")
+
+    @staticmethod
+    def write(row: np.ndarray, compiled: Tuple[np.ndarray, np.ndarray], values) -> None:
+        """Write a producer's values (in its compiled name order) into row."""
+        slots, positions = compiled
+        row[slots] = np.asarray(values, dtype=np.float64)[positions]
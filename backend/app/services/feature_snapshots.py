@@ -0,0 +1,156 @@
+# feature_snapshots.py
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.fight_stats import EMA_FEATURES
+from app.core.fight_store import to_day_number
+
+SNAPSHOT_FORMAT_VERSION = 2  # 2: same-day bouts ordered by descending row
+
+def file_digest(path) -> str:
+    """SHA-256 of a file's contents, used to tie snapshots to the CSV they were built from."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+class FighterSnapshots:
+    """
+    Per-fighter history features as of each of the fighter's fight dates.
+
+    Rows for one fighter are contiguous and sorted by as_of date. Row j holds
+    the state after every fight on or before as_of[j], which is exactly what a
+    prediction for any event date in (as_of[j], as_of[j + 1]] sees.
+    """
+
+    def __init__(self, names, offsets, as_of, record, ema, method_wins, ema_features, source_digest):
+        self.names = names
+        self.offsets = offsets
+        self.as_of = as_of              # datetime64[D], one per snapshot row
+        self.record = record            # int32 (rows, 3): wins, losses, win streak
+        self.ema = ema                  # float64 (rows, len(ema_features))
+        self.method_wins = method_wins  # int32 (fighters, 3): Decision, KO/TKO, Submission
+        self.ema_features = list(ema_features)
+        self.source_digest = source_digest
+        self.fighter_index = {name: i for i, name in enumerate(self.names)}
+
+    def lookup(self, fighter_name, event_date) -> Optional[Dict]:
+        """Latest snapshot strictly before event_date, or None when the fighter has no prior fights."""
+        fighter = self.fighter_index.get(fighter_name)
+        if fighter is None:
+            return None
+
+        start, end = self.offsets[fighter], self.offsets[fighter + 1]
+        event_day = np.datetime64(to_day_number(event_date, ceil=True), 'D')
+        row = start + np.searchsorted(self.as_of[start:end], event_day, side='left') - 1
+        if row < start:
+            return None
+
+        wins, losses, win_streak = (int(v) for v in self.record[row])
+        return {
+            'wins': wins,
+            'losses': losses,
+            'win_streak': win_streak,
+            'last_fight_date': pd.Timestamp(self.as_of[row]),
+            'ema_values': self.ema[row]     # in EMA_FEATURES order (checked on load)
+        }
+
+    def get_method_wins(self, fighter_name) -> Optional[Dict]:
+        """Career method wins for a fighter (not date-dependent), or None if unknown."""
+        fighter = self.fighter_index.get(fighter_name)
+        if fighter is None:
+            return None
+        decision, ko_tko, submission = (int(v) for v in self.method_wins[fighter])
+        return {'Decision': decision, 'KO/TKO': ko_tko, 'Submission': submission}
+
+    def save(self, path) -> None:
+        np.savez(
+            path,
+            format_version=np.int32(SNAPSHOT_FORMAT_VERSION),
+            source_digest=np.array(self.source_digest),
+            ema_features=np.array(self.ema_features),
+            names=np.array(self.names),
+            offsets=self.offsets,
+            as_of=self.as_of,
+            record=self.record,
+            ema=self.ema,
+            method_wins=self.method_wins
+        )
+
+    @classmethod
+    def load(cls, path) -> 'FighterSnapshots':
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['format_version']) != SNAPSHOT_FORMAT_VERSION:
+                raise ValueError(f"Unsupported snapshot format version: {int(data['format_version'])}")
+            return cls(
+                names=data['names'].tolist(),
+                offsets=data['offsets'],
+                as_of=data['as_of'],
+                record=data['record'],
+                ema=data['ema'],
+                method_wins=data['method_wins'],
+                ema_features=data['ema_features'].tolist(),
+                source_digest=str(data['source_digest'])
+            )
+
+def build_fighter_snapshots(predictor, source_digest: str) -> FighterSnapshots:
+    """
+    Offline build: evaluate the predictor's own history features for every
+    fighter just after each distinct fight date, so lookups match the live path.
+    """
+    store = predictor.fight_store
+    names = sorted(store.fighter_names)
+    offsets = [0]
+    as_of, record, ema, method_wins = [], [], [], []
+
+    for name in names:
+        fight_days = np.unique(store.appearance_days[store.appearances(name)]).astype('datetime64[D]')
+        for day in fight_days:
+            # Any event after this day sees every fight on or before it
+            after = pd.Timestamp(day) + pd.Timedelta(days=1)
+            wins, losses, _ = predictor.calculate_fighter_record(name, after)
+            win_streak = predictor.calculate_win_streak(name, after)
+            emas = predictor.calculate_ema_features(name, after)
+
+            as_of.append(day)
+            record.append((wins, losses, win_streak))
+            ema.append([emas[feat] for feat in EMA_FEATURES])
+        offsets.append(len(as_of))
+
+        wins_by_method = predictor.calculate_method_wins(name)
+        method_wins.append([wins_by_method['Decision'], wins_by_method['KO/TKO'], wins_by_method['Submission']])
+
+    return FighterSnapshots(
+        names=names,
+        offsets=np.array(offsets, dtype=np.int64),
+        as_of=np.array(as_of, dtype='datetime64[D]'),
+        record=np.array(record, dtype=np.int32).reshape(-1, 3),
+        ema=np.array(ema, dtype=np.float64).reshape(-1, len(EMA_FEATURES)),
+        method_wins=np.array(method_wins, dtype=np.int32).reshape(-1, 3),
+        ema_features=EMA_FEATURES,
+        source_digest=source_digest
+    )
+
+def load_fighter_snapshots(path, source_digest: str) -> Optional[FighterSnapshots]:
+    """Load snapshots if present and built from the same CSV; otherwise None (live computation)."""
+    path = Path(path)
+    if not path.exists():
+        print(f"No fighter snapshots at {path}; computing history features live")
+        return None
+
+    try:
+        snapshots = FighterSnapshots.load(path)
+    except Exception as e:
+        print(f"Could not load fighter snapshots from {path}: {e}")
+        return None
+
+    if snapshots.source_digest != source_digest:
+        print(f"Fighter snapshots at {path} are stale (dataset changed); computing history features live")
+        return None
+
+    if snapshots.ema_features != EMA_FEATURES:
+        print(f"Fighter snapshots at {path} were built with different EMA features; computing history features live")
+        return None
+
+    return snapshots
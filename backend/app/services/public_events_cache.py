@@ -0,0 +1,293 @@
+# public_events_cache.py
+import base64
+import bisect
+import gzip
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.http_cache import make_etag
+from models import Event, Match
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+# Assembled page bodies kept per snapshot (first pages of each variant are the hot ones)
+MAX_CACHED_PAGES = 64
+
+def serialize_public_match(match: Match, include_predictions: bool) -> Dict[str, Any]:
+    match_dict = {
+        'id': str(match.id),
+        'fighter1': match.fighter1,
+        'fighter2': match.fighter2,
+        'odds1': match.odds1,
+        'odds2': match.odds2,
+        'referee': match.referee,
+        'weightclass': match.weightclass,
+        'event_date': f"{match.event_date.isoformat()}T00:00:00Z",
+        'result': match.result,
+        'created_at': match.created_at.isoformat()
+    }
+    if include_predictions:
+        match_dict['prediction_data'] = match.prediction_data
+    return match_dict
+
+def serialize_public_event(event: Event, include_predictions: bool) -> Dict[str, Any]:
+    return {
+        'id': str(event.id),
+        'name': event.name,
+        'date': event.date.isoformat(),
+        'location': event.location,
+        'created_at': event.created_at.isoformat(),
+        'matches': [serialize_public_match(match, include_predictions) for match in (event.matches or [])]
+    }
+
+def encode_events_cursor(event_date: date, event_id) -> str:
+    """Opaque keyset cursor for the page after the event with this (date, id)."""
+    raw = f"{event_date.isoformat()}|{event_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def encode_json(value) -> bytes:
+    # Same separators as FastAPI's JSONResponse
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """'br', 'gzip' or None (identity) for an Accept-Encoding header."""
+    offered = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+    if brotli is not None and 'br' in offered:
+        return 'br'
+    if 'gzip' in offered:
+        return 'gzip'
+    return None
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body)
+    if encoding == 'gzip':
+        # mtime=0 keeps the bytes (and so the strong ETag) stable across rebuilds
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    return body
+
+class MemoryGenerationBackend:
+    """Change counter for one process; also the local stand-in for a shared backend."""
+
+    def __init__(self):
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    async def get(self) -> int:
+        return self._generation
+
+    async def bump(self) -> int:
+        with self._lock:
+            self._generation += 1
+            return self._generation
+
+class RedisGenerationBackend:
+    """Change counter in Redis (or anything speaking its protocol), shared by every worker."""
+
+    def __init__(self, url: Optional[str], key: str):
+        if not url:
+            raise ValueError("public_events_cache_backend is 'redis' but redis_url is not set")
+        try:
+            import redis.asyncio
+        except ImportError:
+            raise RuntimeError("public_events_cache_backend is 'redis' but the redis package is not installed")
+        self.client = redis.asyncio.Redis.from_url(url)
+        self.key = key
+
+    async def get(self) -> int:
+        return int(await self.client.get(self.key) or 0)
+
+    async def bump(self) -> int:
+        return int(await self.client.incr(self.key))
+
+class PublicEventPage:
+    """One assembled page: body per content coding, validators and the next cursor."""
+
+    def __init__(self, body: bytes, next_cursor: Optional[str]):
+        self.body = body
+        self.next_cursor = next_cursor
+        self.etag = make_etag('public-events', body)
+        self._encoded: Dict[Optional[str], bytes] = {None: body}
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if encoding not in self._encoded:
+            self._encoded[encoding] = compress(self.body, encoding)
+        return self._encoded[encoding]
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        # A strong ETag names one representation, so each content coding gets its own
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+class PublicEventsCache:
+    """
+    Materialized /public-events: every event serialized once (with and
+    without prediction_data) as a JSON fragment, kept in (date, id) order.
+
+    Pages are joined from fragments and compressed once, then served from
+    memory until something changes. The event and match routes call
+    event_changed / event_deleted after committing, which re-serializes
+    just that event. The generation backend tells other workers about the
+    change; a worker whose snapshot is behind the shared generation rebuilds
+    it from the database on its next read.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.RLock()
+        self._generation: Optional[int] = None  # None: no snapshot yet, or it must be rebuilt
+        self._keys: List[Tuple[date, uuid.UUID]] = []  # ascending; pages walk it from the end
+        self._fragments: Dict[uuid.UUID, Tuple[bytes, bytes]] = {}  # id -> (full, lite)
+        self._pages: "OrderedDict[Tuple, PublicEventPage]" = OrderedDict()
+
+        self.full_rebuilds = 0
+        self.incremental_updates = 0
+        self.page_hits = 0
+        self.page_builds = 0
+
+    async def get_page(self, db: AsyncSession, limit: int, after: Optional[Tuple[date, uuid.UUID]],
+                       include_predictions: bool) -> PublicEventPage:
+        """The page of up to limit events strictly after the cursor key, newest first."""
+        generation = await self.backend.get()
+        if self._generation != generation:
+            # Load outside the lock; the lock is never held across an await
+            result = await db.execute(select(Event).options(selectinload(Event.matches)))
+            events = result.scalars().all()
+            with self._lock:
+                self._rebuild(events, generation)
+        with self._lock:
+            return self._page(limit, after, include_predictions)
+
+    async def event_changed(self, db: AsyncSession, event_id) -> None:
+        """Re-serialize one event (after it or one of its matches was written)."""
+        event_id = self._as_uuid(event_id)
+        result = await db.execute(
+            select(Event).options(selectinload(Event.matches)).where(Event.id == event_id)
+            .execution_options(populate_existing=True)
+        )
+        event = result.scalars().first()
+        with self._lock:
+            self._remove(event_id)
+            if event is not None:
+                self._add(event)
+            previous = self._generation
+        await self._publish_change(previous)
+
+    async def event_deleted(self, event_id) -> None:
+        with self._lock:
+            self._remove(self._as_uuid(event_id))
+            previous = self._generation
+        await self._publish_change(previous)
+
+    async def invalidate(self) -> None:
+        """Drop the snapshot here and in every worker sharing the backend."""
+        with self._lock:
+            self._generation = None
+            self._pages.clear()
+        await self.backend.bump()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__,
+                "generation": self._generation,
+                "events": len(self._keys),
+                "fragment_bytes": sum(len(full) + len(lite) for full, lite in self._fragments.values()),
+                "cached_pages": len(self._pages),
+                "page_hits": self.page_hits,
+                "page_builds": self.page_builds,
+                "full_rebuilds": self.full_rebuilds,
+                "incremental_updates": self.incremental_updates
+            }
+
+    def _page(self, limit: int, after: Optional[Tuple[date, uuid.UUID]],
+              include_predictions: bool) -> PublicEventPage:
+        # Caller holds the lock
+        page_key = (limit, after, include_predictions)
+        page = self._pages.get(page_key)
+        if page is not None:
+            self._pages.move_to_end(page_key)
+            self.page_hits += 1
+            return page
+
+        end = bisect.bisect_left(self._keys, after) if after is not None else len(self._keys)
+        start = max(0, end - limit)
+        keys = self._keys[start:end][::-1]
+        fragments = [self._fragments[event_id][0 if include_predictions else 1] for _, event_id in keys]
+        next_cursor = encode_events_cursor(*keys[-1]) if start > 0 and keys else None
+
+        page = PublicEventPage(b'[' + b','.join(fragments) + b']', next_cursor)
+        self._pages[page_key] = page
+        if len(self._pages) > MAX_CACHED_PAGES:
+            self._pages.popitem(last=False)
+        self.page_builds += 1
+        return page
+
+    def _warm(self) -> None:
+        # The first page with default options is what every visitor asks for
+        self._page(settings.public_events_page_size, None, True).encoded('gzip')
+
+    def _rebuild(self, events: List[Event], generation: int) -> None:
+        # Caller holds the lock
+        self._keys, self._fragments = [], {}
+        for event in events:
+            self._add(event)
+        self._pages.clear()
+        self._generation = generation
+        self.full_rebuilds += 1
+        self._warm()
+
+    async def _publish_change(self, previous: Optional[int]) -> None:
+        # Our snapshot already has the change; it stays current unless another
+        # worker (or another write here) bumped the generation in between
+        generation = await self.backend.bump()
+        with self._lock:
+            self._pages.clear()
+            self.incremental_updates += 1
+            current = previous is not None and self._generation == previous and generation == previous + 1
+            self._generation = generation if current else None
+            if current:
+                self._warm()
+
+    def _add(self, event: Event) -> None:
+        event_id = self._as_uuid(event.id)
+        bisect.insort(self._keys, (event.date, event_id))
+        self._fragments[event_id] = (
+            encode_json(serialize_public_event(event, True)),
+            encode_json(serialize_public_event(event, False))
+        )
+
+    def _remove(self, event_id: uuid.UUID) -> None:
+        if self._fragments.pop(event_id, None) is None:
+            return
+        self._keys = [key for key in self._keys if key[1] != event_id]
+
+    @staticmethod
+    def _as_uuid(value) -> uuid.UUID:
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+_public_events_cache: Optional[PublicEventsCache] = None
+_public_events_cache_lock = threading.Lock()
+
+def get_public_events_cache() -> PublicEventsCache:
+    """Get the process-wide public events cache, creating it from settings on first use."""
+    global _public_events_cache
+    with _public_events_cache_lock:
+        if _public_events_cache is None:
+            if settings.public_events_cache_backend == 'redis':
+                backend = RedisGenerationBackend(settings.redis_url, settings.public_events_cache_key)
+            else:
+                backend = MemoryGenerationBackend()
+            _public_events_cache = PublicEventsCache(backend)
+        return _public_events_cache
@@ -0,0 +1,172 @@
+# result_cache.py
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+# Rough per-entry overhead (dict slot, key tuple, array header) on top of the strings and floats
+ENTRY_OVERHEAD_BYTES = 256
+
+def state_fingerprint(model_digests: Dict[str, str], dataset_digests: Dict[str, str]) -> Optional[str]:
+    """One digest over every model and dataset file a prediction depends on, or None if any is unknown."""
+    if not model_digests or not dataset_digests or None in model_digests.values():
+        return None
+    hasher = hashlib.sha256()
+    for kind, digests in (('model', model_digests), ('dataset', dataset_digests)):
+        for name in sorted(digests):
+            hasher.update(f"{kind}:{name}:{digests[name]}\0".encode())
+    return hasher.hexdigest()
+
+class PredictionResultCache:
+    """
+    Entry- and byte-bounded LRU cache of combined_predict probabilities.
+
+    Values are the raw probabilities (winner pair, plus both method
+    distributions for method predictions), so a hit is formatted exactly like
+    a fresh prediction. Keys carry the state fingerprint of the models and
+    datasets they were computed from. Only the installed state's fingerprint
+    (set_fingerprint, called when a state is installed) is cached; requests
+    still finishing on a replaced state bypass the cache.
+
+    With mirror_matchups, "B vs A" is served from a cached "A vs B" by
+    swapping the two sides. The winner model is not order-symmetric (the
+    same bout scored both ways differs), so this trades exactness for hit
+    rate and is off by default.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, mirror_matchups: bool = False):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.mirror_matchups = mirror_matchups
+
+        self._entries: "OrderedDict[Tuple, Tuple[np.ndarray, int]]" = OrderedDict()  # key -> (values, bytes)
+        self._bytes = 0
+        self._fingerprint: Optional[str] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.mirrored_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.bypassed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def make_key(self, fingerprint: str, p1: str, p2: str, event_date: str, referee: str,
+                 prediction_type: str) -> Tuple[Tuple, bool]:
+        """(key, mirrored): mirrored means the key stores the bout as p2 vs p1."""
+        mirrored = self.mirror_matchups and p2 < p1
+        first, second = (p2, p1) if mirrored else (p1, p2)
+        return (fingerprint, first, second, event_date, referee, prediction_type), mirrored
+
+    def set_fingerprint(self, fingerprint: Optional[str]) -> None:
+        """Serve the state with this fingerprint from now on, dropping entries for any other."""
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                if self._entries:
+                    self.invalidations += 1
+                self._clear()
+                self._fingerprint = fingerprint
+
+    def get(self, key: Tuple, mirrored: bool) -> Optional[np.ndarray]:
+        """Cached probabilities for the request's own fighter order, or None."""
+        with self._lock:
+            if not self._is_current(key[0]):
+                return None
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            value = entry[0]
+            self.hits += 1
+            if mirrored:
+                self.mirrored_hits += 1
+        return swap_sides(value) if mirrored else value
+
+    def put(self, key: Tuple, mirrored: bool, value: np.ndarray) -> None:
+        """Cache probabilities given in the request's own fighter order."""
+        stored = swap_sides(value) if mirrored else value.copy()
+        stored.flags.writeable = False
+        size = ENTRY_OVERHEAD_BYTES + stored.nbytes + sum(len(part) for part in key[1:])
+        with self._lock:
+            # A request on a replaced state already counted as bypassed in get()
+            if key[0] is None or key[0] != self._fingerprint or size > self.max_bytes:
+                return
+
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (stored, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. after a model or dataset reload."""
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> Dict:
+        """Counters exposed on the model status endpoint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "mirror_matchups": self.mirror_matchups,
+                "hits": self.hits,
+                "mirrored_hits": self.mirrored_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "bypassed": self.bypassed
+            }
+
+    def _is_current(self, fingerprint: str) -> bool:
+        # Caller holds the lock
+        if fingerprint is not None and fingerprint == self._fingerprint:
+            return True
+        self.bypassed += 1
+        return False
+
+    def _clear(self) -> None:
+        # Caller holds the lock
+        self._entries.clear()
+        self._bytes = 0
+
+def swap_sides(values: np.ndarray) -> np.ndarray:
+    """
+    Probabilities as seen from the other corner: [p1_win, p2_win, p1 methods..., p2 methods...]
+    becomes [p2_win, p1_win, p2 methods..., p1 methods...].
+    """
+    half = (len(values) - 2) // 2
+    return np.concatenate([values[1::-1], values[2 + half:], values[2:2 + half]])
+
+_prediction_result_cache: Optional[PredictionResultCache] = None
+_prediction_result_cache_lock = threading.Lock()
+
+def get_prediction_result_cache() -> PredictionResultCache:
+    """Get the process-wide prediction result cache, creating it from settings on first use."""
+    global _prediction_result_cache
+    with _prediction_result_cache_lock:
+        if _prediction_result_cache is None:
+            _prediction_result_cache = PredictionResultCache(
+                max_entries=settings.prediction_cache_max_entries,
+                max_bytes=settings.prediction_cache_max_bytes,
+                mirror_matchups=settings.prediction_cache_mirror_matchups
+            )
+        return _prediction_result_cache
@@ -0,0 +1,188 @@
+# scoring.py
+import json
+from typing import Optional
+
+import numpy as np
+
+# Objectives whose predict_proba both scorers can reproduce
+SUPPORTED_OBJECTIVES = ('binary:logistic', 'multi:softmax', 'multi:softprob')
+
+def softmax(margins: np.ndarray) -> np.ndarray:
+    shifted = np.exp(margins - margins.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+def margins_to_proba(objective: str, margins: np.ndarray) -> np.ndarray:
+    """(n, 1) or (n, k) margins -> (n, n_classes) probabilities, the way XGBClassifier.predict_proba returns them."""
+    if objective == 'binary:logistic':
+        p1 = 1.0 / (1.0 + np.exp(-margins[:, 0]))
+        return np.column_stack([1.0 - p1, p1])
+    return softmax(margins)
+
+class BoosterScorer:
+    """
+    predict_proba for small batches straight through Booster.inplace_predict.
+
+    Skips the sklearn wrapper's per-call checks and DMatrix construction. The
+    scorer owns a copy of the booster pinned to `nthread` threads: for one to
+    a few dozen rows, spinning up the OpenMP team costs more than it saves,
+    and the shared model's settings stay untouched.
+    """
+
+    name = 'inplace'
+
+    def __init__(self, model, nthread: int = 1):
+        self.objective = model.objective
+        if self.objective not in SUPPORTED_OBJECTIVES:
+            raise ValueError(f"Unsupported objective for inplace scoring: {self.objective}")
+        self.booster = model.get_booster().copy()
+        self.booster.set_param({'nthread': nthread})
+
+    def margins(self, rows: np.ndarray) -> np.ndarray:
+        margins = self.booster.inplace_predict(rows, predict_type='margin', validate_features=False)
+        return margins.reshape(len(rows), -1).astype(np.float64)
+
+    def predict_proba(self, rows: np.ndarray) -> np.ndarray:
+        if self.objective == 'multi:softmax':
+            # predict_proba applies softmax to the margins for this objective
+            return softmax(self.margins(rows))
+        values = self.booster.inplace_predict(rows, validate_features=False)
+        if self.objective == 'binary:logistic':
+            return np.column_stack([1.0 - values, values]).astype(np.float64)
+        return values.astype(np.float64)
+
+class CompiledTreeEnsemble:
+    """
+    The booster's trees flattened into NumPy arrays and evaluated without XGBoost.
+
+    Every node of every tree gets a global index; leaves point to themselves,
+    so walking all trees one level per step for max_depth steps lands every
+    tree on its leaf. Comparisons run in float32 like XGBoost's own predictor.
+    Only numerical splits and the objectives in SUPPORTED_OBJECTIVES are
+    supported; anything else raises ValueError.
+    """
+
+    name = 'compiled'
+
+    def __init__(self, model):
+        self.objective = model.objective
+        if self.objective not in SUPPORTED_OBJECTIVES:
+            raise ValueError(f"Unsupported objective for compiled scoring: {self.objective}")
+
+        learner = json.loads(model.get_booster().save_raw('json'))['learner']
+        booster_model = learner['gradient_booster']
+        if booster_model['name'] != 'gbtree':
+            raise ValueError(f"Only gbtree boosters can be compiled, got {booster_model['name']}")
+        trees = booster_model['model']['trees']
+        tree_class = np.array(booster_model['model']['tree_info'], dtype=np.intp)
+
+        params = learner['learner_model_param']
+        self.n_features = int(params['num_feature'])
+        self.n_outputs = max(1, int(params['num_class']))
+        base_score = np.array(params['base_score'].strip('[]').split(','), dtype=np.float64)
+        if self.objective == 'binary:logistic':
+            base_score = np.log(base_score / (1.0 - base_score))
+        self.base_margin = np.broadcast_to(base_score, (self.n_outputs,)).copy()
+
+        feature, threshold, default_left, left, right, depth, roots = [], [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            if any(tree['split_type']) or tree['categories']:
+                raise ValueError("Categorical splits cannot be compiled")
+            n_nodes = len(tree['left_children'])
+            tree_left = np.array(tree['left_children'], dtype=np.intp)
+            tree_right = np.array(tree['right_children'], dtype=np.intp)
+            is_leaf = tree_left == -1
+            own = np.arange(n_nodes)
+
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, tree['split_indices']))
+            threshold.append(tree['split_conditions'])  # leaf value on leaves
+            default_left.append(tree['default_left'])
+            left.append(np.where(is_leaf, own, tree_left) + offset)
+            right.append(np.where(is_leaf, own, tree_right) + offset)
+
+            # Children always come after their parent, so one pass gives every node's depth
+            tree_depth = np.zeros(n_nodes, dtype=np.intp)
+            for node in np.flatnonzero(~is_leaf):
+                tree_depth[tree_left[node]] = tree_depth[tree_right[node]] = tree_depth[node] + 1
+            depth.append(tree_depth.max())
+            offset += n_nodes
+
+        self.feature = np.concatenate(feature).astype(np.intp)
+        self.threshold = np.concatenate(threshold).astype(np.float32)
+        self.default_left = np.concatenate(default_left).astype(bool)
+        self.left = np.concatenate(left)
+        self.right = np.concatenate(right)
+        self.roots = np.array(roots, dtype=np.intp)
+        self.max_depth = int(max(depth))
+        self.leaf_value = self.threshold.astype(np.float64)
+        # (n_trees, n_outputs) one-hot of each tree's output group, so leaf sums are one matmul
+        self.tree_outputs = np.zeros((len(trees), self.n_outputs))
+        self.tree_outputs[np.arange(len(trees)), tree_class] = 1.0
+
+    def leaves(self, rows: np.ndarray) -> np.ndarray:
+        """(n, n_trees) global index of the leaf each row reaches in each tree."""
+        rows = np.asarray(rows, dtype=np.float32)
+        nodes = np.tile(self.roots, (len(rows), 1))
+        row_index = np.arange(len(rows))[:, np.newaxis]
+        for _ in range(self.max_depth):
+            values = rows[row_index, self.feature[nodes]]
+            go_left = np.where(np.isnan(values), self.default_left[nodes], values < self.threshold[nodes])
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def margins(self, rows: np.ndarray) -> np.ndarray:
+        return self.leaf_value[self.leaves(rows)] @ self.tree_outputs + self.base_margin
+
+    def predict_proba(self, rows: np.ndarray) -> np.ndarray:
+        return margins_to_proba(self.objective, self.margins(rows))
+
+    def probe_rows(self, n_rows: int = 64, seed: int = 0) -> np.ndarray:
+        """
+        Rows built from the model's own split thresholds (nudged to either side,
+        some missing), so a comparison exercises many branches of every tree.
+        """
+        rng = np.random.default_rng(seed)
+        is_split = self.left != np.arange(len(self.left))
+        split_features, split_values = self.feature[is_split], self.threshold[is_split]
+
+        rows = np.full((n_rows, self.n_features), np.nan, dtype=np.float32)
+        for f in range(self.n_features):
+            candidates = split_values[split_features == f]
+            if len(candidates) == 0:
+                continue
+            picked = rng.choice(candidates, n_rows)
+            nudged = np.where(rng.random(n_rows) < 0.5, np.nextafter(picked, -np.inf), picked)
+            rows[:, f] = np.where(rng.random(n_rows) < 0.1, np.nan, nudged)
+        return rows
+
+def build_scorer(model, engine: str = 'inplace', nthread: int = 1, tolerance: float = 1e-6):
+    """
+    Scorer with predict_proba(rows) for one model.
+
+    engine 'compiled' is checked against inplace_predict on probe rows and
+    falls back to the inplace scorer when it cannot be built or disagrees by
+    more than tolerance. 'sklearn' keeps the XGBClassifier itself.
+    """
+    if engine == 'sklearn':
+        return model
+    if engine not in ('inplace', 'compiled'):
+        raise ValueError(f"prediction_engine must be 'inplace', 'compiled' or 'sklearn', got: {engine}")
+
+    reference = BoosterScorer(model, nthread)
+    if engine == 'inplace':
+        return reference
+
+    compiled: Optional[CompiledTreeEnsemble] = None
+    try:
+        compiled = CompiledTreeEnsemble(model)
+        probes = compiled.probe_rows()
+        max_diff = float(np.abs(compiled.predict_proba(probes) - reference.predict_proba(probes)).max())
+    except ValueError as e:
+        print(f"Could not compile trees ({e}); using inplace_predict")
+        return reference
+
+    if max_diff > tolerance:
+        print(f"Compiled trees differ from inplace_predict by {max_diff:.2e}; using inplace_predict")
+        return reference
+    return compiled
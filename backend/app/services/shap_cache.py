@@ -0,0 +1,153 @@
+# shap_cache.py
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+DATA_URI_PREFIX = "data:image/png;base64,"
+
+class ShapImageCache:
+    """Byte-bounded LRU cache of rendered SHAP plots, optionally mirrored to a directory on disk."""
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[Path] = None, disk_max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(model_digest: str, p1_name: str, p2_name: str, model_input: np.ndarray) -> str:
+        """Content address for a plot: model file digest, the names drawn on it, and the feature vector."""
+        hasher = hashlib.sha256()
+        hasher.update(model_digest.encode())
+        hasher.update(b'\0' + p1_name.encode() + b'\0' + p2_name.encode() + b'\0')
+        hasher.update(np.ascontiguousarray(model_input, dtype=np.float64).tobytes())
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached data URI for key, checking memory then disk."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, value)
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        """Cache a rendered data URI under key."""
+        with self._lock:
+            self._store(key, value)
+        self._write_disk(key, value)
+
+    def clear(self) -> None:
+        """Drop all in-memory entries (disk files are left for reuse)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """Counters exposed on the model status endpoint."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_dir": str(self.disk_dir) if self.disk_dir else None
+            }
+
+    def _store(self, key: str, value: str) -> None:
+        # Caller holds the lock
+        size = len(value)
+        if size > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+
+        self._entries[key] = value
+        self._bytes += size
+
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if self.disk_dir is None:
+            return None
+        path = self.disk_dir / f"{key}.png"
+        try:
+            png_bytes = path.read_bytes()
+        except OSError:
+            return None
+        return DATA_URI_PREFIX + base64.b64encode(png_bytes).decode('utf-8')
+
+    def _write_disk(self, key: str, value: str) -> None:
+        if self.disk_dir is None or not value.startswith(DATA_URI_PREFIX):
+            return
+        try:
+            path = self.disk_dir / f"{key}.png"
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_bytes(base64.b64decode(value[len(DATA_URI_PREFIX):]))
+            tmp_path.replace(path)
+            self._prune_disk()
+        except OSError as e:
+            print(f"Could not write SHAP cache file: {e}")
+
+    def _prune_disk(self) -> None:
+        # Keep the directory under its byte budget by removing the oldest files
+        if not self.disk_max_bytes:
+            return
+        files = [(p.stat().st_mtime, p.stat().st_size, p) for p in self.disk_dir.glob('*.png')]
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+_shap_image_cache: Optional[ShapImageCache] = None
+_shap_image_cache_lock = threading.Lock()
+
+def get_shap_image_cache() -> ShapImageCache:
+    """Get the process-wide SHAP image cache, creating it from settings on first use."""
+    global _shap_image_cache
+    with _shap_image_cache_lock:
+        if _shap_image_cache is None:
+            _shap_image_cache = ShapImageCache(
+                max_bytes=settings.shap_cache_max_bytes,
+                disk_dir=settings.shap_cache_dir,
+                disk_max_bytes=settings.shap_cache_disk_max_bytes
+            )
+        return _shap_image_cache
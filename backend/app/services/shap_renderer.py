@@ -0,0 +1,244 @@
+# shap_renderer.py
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+# matplotlib is imported inside the functions below so the API process never
+# pays for it; renderer processes import it once in _init_renderer.
+
+def _init_renderer() -> None:
+    """Import matplotlib once when a renderer process starts"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.figure  # noqa: F401
+    import matplotlib.patches  # noqa: F401
+    import matplotlib.backends.backend_agg  # noqa: F401
+
+def _ping() -> bool:
+    return True
+
+def render_shap_png(p1_name: str, p2_name: str, bars: List[Dict], p1_prob: float) -> bytes:
+    """
+    Renders grouped SHAP bars to PNG bytes with the object-oriented Figure API (no pyplot state).
+    Each bar is a dict with 'name', 'shap_value', 'category' and 'color'.
+    """
+    import numpy as np
+    import matplotlib.style
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Patch
+
+    predicted_winner = p1_name if p1_prob > 0.5 else p2_name
+
+    with matplotlib.style.context('dark_background'):
+        # Create the plot with proper margins
+        fig = Figure(figsize=(16, 10))
+        ax = fig.subplots()
+        fig.patch.set_facecolor('#121212')
+
+        feature_names = [f['name'] for f in bars]
+        shap_vals = [f['shap_value'] for f in bars]
+        categories = [f['category'] for f in bars]
+        colors = [f['color'] for f in bars]
+        category_colors = dict(zip(categories, colors))
+
+        # Create bars
+        y_pos = np.arange(len(feature_names))
+        bar_patches = ax.barh(y_pos, shap_vals, color=colors, alpha=0.8, edgecolor='white', linewidth=0.5)
+
+        # Customize the plot
+        ax.set_yticks(y_pos)
+        ax.set_yticklabels(feature_names, fontsize=11, color='white')
+        ax.invert_yaxis()
+        ax.set_xlabel('SHAP Impact', color='white', fontsize=14, fontweight='bold')
+        ax.axvline(0, color='white', linewidth=2, alpha=0.8)
+
+        # REMOVE ALL GRID LINES
+        ax.grid(False)
+
+        ax.set_facecolor('#121212')
+
+        # Set x-axis increments to 0.1
+        x_min, x_max = ax.get_xlim()
+        # Extend range to nearest 0.1 increments
+        x_min_rounded = np.floor(x_min * 10) / 10
+        x_max_rounded = np.ceil(x_max * 10) / 10
+
+        # Add margin for text
+        margin = 0.05
+        x_min_rounded -= margin
+        x_max_rounded += margin
+
+        ax.set_xlim(x_min_rounded, x_max_rounded)
+
+        # Set x-axis ticks to 0.1 increments
+        x_ticks = np.arange(x_min_rounded, x_max_rounded + 0.1, 0.1)
+        ax.set_xticks(x_ticks)
+
+        # Add light grey vertical lines at every OTHER increment
+        for i, tick in enumerate(x_ticks):
+            if tick != 0 and i % 2 == 0:  # Every other increment, skipping 0
+                ax.axvline(tick, color='lightgrey', linewidth=0.5, alpha=0.3)
+
+        # Add clear direction indicators
+        ax.text(0.02, 1.02, f'← Favors {p2_name}', transform=ax.transAxes,
+                color='#4444FF', fontsize=14, fontweight='bold', va='bottom')
+        ax.text(0.98, 1.02, f'Favors {p1_name} →', transform=ax.transAxes,
+                color='#FF4444', fontsize=14, fontweight='bold', va='bottom', ha='right')
+
+        # Add value labels with better positioning
+        x_min, x_max = ax.get_xlim()
+        x_range = x_max - x_min
+        safe_margin = x_range * 0.02  # 2% safe margin from edges
+
+        for bar, val in zip(bar_patches, shap_vals):
+            if val > 0:
+                label_x = val + 0.003
+                if label_x > x_max - safe_margin:
+                    label_x = x_max - safe_margin
+                ha = 'left'
+            else:
+                label_x = val - 0.003
+                if label_x < x_min + safe_margin:
+                    label_x = x_min + safe_margin
+                ha = 'right'
+
+            ax.text(label_x, bar.get_y() + bar.get_height()/2, f'{val:.3f}',
+                   ha=ha, va='center', color='white', fontsize=10, fontweight='bold')
+
+        # Add horizontal lines between categories
+        current_category = None
+        separator_positions = []
+
+        for i, cat in enumerate(categories):
+            if cat != current_category:
+                if current_category is not None:
+                    separator_positions.append(i - 0.5)
+                current_category = cat
+
+        # Draw the separator lines
+        for sep_pos in separator_positions:
+            ax.axhline(y=sep_pos, color='white', linewidth=1, alpha=0.7)
+
+        # Add title
+        ax.set_title(f'SHAP Feature Analysis: {p1_name} vs {p2_name}\nPredicted Winner: {predicted_winner} ({max(p1_prob, 1-p1_prob):.1%}', color='white', fontsize=16, fontweight='bold', pad=25)
+
+        # Create legend for categories
+        legend_elements = []
+        seen_categories = []
+        for cat in categories:
+            if cat not in seen_categories:
+                legend_elements.append(Patch(facecolor=category_colors[cat], label=cat))
+                seen_categories.append(cat)
+
+        ax.legend(handles=legend_elements, loc='lower right', facecolor='#121212',
+                 edgecolor='white', fontsize=13)
+
+        ax.tick_params(colors='white')
+
+        # Enhanced margins to prevent text cutoff
+        fig.tight_layout()
+        fig.subplots_adjust(top=0.88, left=0.25, right=0.92, bottom=0.08)
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', facecolor='#121212', dpi=150, bbox_inches='tight')
+
+    return buffer.getvalue()
+
+class ShapRenderPool:
+    """Pool of dedicated renderer processes that turn grouped SHAP bars into PNG bytes."""
+
+    def __init__(self, processes: int, recycle_after: int, timeout: float):
+        self.processes = processes
+        self.recycle_after = recycle_after
+        self.timeout = timeout
+        self.renders = 0
+        self.restarts = 0
+        self._lock = threading.Lock()
+        # With no processes configured, render in-process; matplotlib style
+        # contexts are global, so those renders are serialized
+        self._inline_lock = threading.Lock()
+        self._pool = self._create_pool() if processes > 0 else None
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        # spawn (not fork): worker threads are running, and max_tasks_per_child needs it.
+        # Spawned processes re-import the parent's __main__, so main.py keeps its
+        # startup side effects (table creation, engine hooks) in the lifespan
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_renderer,
+            max_tasks_per_child=self.recycle_after or None
+        )
+
+    def warm_up(self) -> None:
+        """Start the renderer processes so the first request does not pay for matplotlib imports"""
+        if self._pool is None:
+            return
+        futures = [self._pool.submit(_ping) for _ in range(self.processes)]
+        for future in futures:
+            future.result(timeout=self.timeout)
+
+    def render(self, p1_name: str, p2_name: str, bars: List[Dict], p1_prob: float) -> bytes:
+        """Render one chart and return PNG bytes"""
+        with self._lock:
+            self.renders += 1
+
+        pool = self._pool
+        if pool is None:
+            with self._inline_lock:
+                return render_shap_png(p1_name, p2_name, bars, p1_prob)
+
+        try:
+            return pool.submit(render_shap_png, p1_name, p2_name, bars, p1_prob).result(timeout=self.timeout)
+        except BrokenProcessPool:
+            # A renderer died (e.g. OOM); replace the pool and retry once. Concurrent
+            # renders see the same failure; only the first replaces it, the rest
+            # retry on the pool it installed
+            with self._lock:
+                if self._pool is pool:
+                    pool.shutdown(wait=False)
+                    self._pool = self._create_pool()
+                    self.restarts += 1
+                future = self._pool.submit(render_shap_png, p1_name, p2_name, bars, p1_prob)
+            return future.result(timeout=self.timeout)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "processes": self.processes,
+                "recycle_after": self.recycle_after,
+                "renders": self.renders,
+                "restarts": self.restarts
+            }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+_shap_render_pool: Optional[ShapRenderPool] = None
+_shap_render_pool_lock = threading.Lock()
+
+def get_shap_render_pool() -> ShapRenderPool:
+    """Get the process-wide SHAP render pool, creating it from settings on first use."""
+    global _shap_render_pool
+    with _shap_render_pool_lock:
+        if _shap_render_pool is None:
+            _shap_render_pool = ShapRenderPool(
+                processes=settings.shap_render_processes,
+                recycle_after=settings.shap_render_recycle_after,
+                timeout=settings.shap_render_timeout_seconds
+            )
+        return _shap_render_pool
+
+def shutdown_shap_render_pool() -> None:
+    """Stop the renderer processes (called from the lifespan on shutdown)."""
+    global _shap_render_pool
+    with _shap_render_pool_lock:
+        if _shap_render_pool is not None:
+            _shap_render_pool.shutdown()
+            _shap_render_pool = None
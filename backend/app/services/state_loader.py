@@ -0,0 +1,218 @@
+# state_loader.py
+import asyncio
+import hashlib
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from app.core.config import settings
+from app.core.globals import PredictionState, get_predictor, set_prediction_state
+from app.services.dataset_cache import load_dataset_cache, source_digests
+from app.services.feature_snapshots import load_fighter_snapshots
+from app.services.predictor import UFCPredictor
+
+MODEL_FILES = {
+    'main': 'data/xgb_model_good.json',
+    'p1_method': 'data/p1_method_target_xgboost_model.json',
+    'p2_method': 'data/p2_method_target_xgboost_model.json'
+}
+
+DATASET_FILES = {
+    'ufc_data': 'data/ufc_cleaned.csv',
+    'fighters': 'data/ufc_fighters_cleaned.csv'
+}
+
+# Read by UFCPredictor when it is built, so a change to them also needs a reload
+METHOD_FEATURE_FILES = ['data/p1_method_features.json', 'data/p2_method_features.json']
+
+class ReloadInProgress(Exception):
+    """Raised when a load is requested while another one is still running."""
+
+_load_lock = threading.Lock()
+# Artifact files as they were when the last load (successful or not) started reading them
+_attempted_signature = None
+_load_status = {
+    'loads': 0,
+    'last_loaded_at': None,
+    'last_error': None,
+    'last_error_at': None
+}
+
+def build_prediction_state() -> Tuple[PredictionState, Dict[str, float]]:
+    """
+    Load models, datasets and snapshots from disk into a new PredictionState
+    and build its predictor. The installed state is not touched, so requests
+    keep being served from it meanwhile. Returns (state, phase timings).
+    """
+    state = PredictionState()
+    phase_times = {}
+
+    # Load XGBoost models (importing xgboost also pulls in sklearn and scipy)
+    phase_start = time.perf_counter()
+    import xgboost as xgb
+    models = {}
+    model_digests = {}
+
+    for model_name, model_path in MODEL_FILES.items():
+        if Path(model_path).exists():
+            model = xgb.XGBClassifier()
+            model.load_model(model_path)
+            models[model_name] = model
+            model_digests[model_name] = hashlib.sha256(Path(model_path).read_bytes()).hexdigest()
+            print(f"Loaded {model_name} model")
+
+    state.models = models
+    state.model_digests = model_digests
+    phase_times['models'] = time.perf_counter() - phase_start
+
+    # The shap package is only needed for the opt-in explainer backend;
+    # the native backend reads contributions straight from the booster
+    phase_start = time.perf_counter()
+    if settings.shap_backend == 'shap':
+        import shap
+        # Build SHAP explainers once so requests don't re-parse the trees
+        explainer_models = ['main']
+        if settings.shap_explain_method_models:
+            explainer_models += ['p1_method', 'p2_method']
+
+        explainers = {}
+        for model_name in explainer_models:
+            if model_name in models:
+                explainers[model_name] = shap.Explainer(models[model_name])
+
+        state.explainers = explainers
+        print(f"Built SHAP explainers for {list(explainers.keys())}")
+    else:
+        print("Using native XGBoost contributions for SHAP values")
+    phase_times['shap_explainers'] = time.perf_counter() - phase_start
+
+    # Load datasets: memory-map the binary cache when it was built from
+    # these exact CSVs, otherwise parse the CSVs
+    phase_start = time.perf_counter()
+    digests = source_digests({name: path for name, path in DATASET_FILES.items() if Path(path).exists()})
+    state.dataset_digests = digests
+
+    cached = load_dataset_cache(settings.dataset_cache_dir, digests)
+    if cached is not None:
+        fight_store, fighters_df, referee_counts = cached
+        state.set_dataset_state(fight_store, fighters_df, referee_counts)
+        print(f"Loaded dataset cache with {fight_store.n_fights} fights and {len(fighters_df)} fighters")
+    else:
+        datasets = {}
+        for dataset_name, dataset_path in DATASET_FILES.items():
+            if Path(dataset_path).exists():
+                dataset = pd.read_csv(dataset_path)
+                datasets[dataset_name] = dataset
+                print(f"Loaded {dataset_name} dataset with {len(dataset)} rows")
+
+        state.set_datasets(datasets)
+    phase_times['datasets'] = time.perf_counter() - phase_start
+
+    # Precomputed per-fighter features, used only if built from this exact CSV
+    phase_start = time.perf_counter()
+    if 'ufc_data' in digests:
+        snapshots = load_fighter_snapshots(settings.fighter_snapshots_path, digests['ufc_data'])
+        state.fighter_snapshots = snapshots
+        if snapshots is not None:
+            print(f"Loaded fighter snapshots for {len(snapshots.names)} fighters")
+    phase_times['snapshots'] = time.perf_counter() - phase_start
+
+    # One long-lived predictor service for every request served from this state
+    phase_start = time.perf_counter()
+    state.predictor = UFCPredictor(state)
+    phase_times['predictor'] = time.perf_counter() - phase_start
+
+    return state, phase_times
+
+def reload_prediction_state(wait: bool = False) -> Dict:
+    """
+    Build a new state from the files on disk and install it in one swap.
+
+    Requests that started before the swap finish on the predictor they
+    already hold; later ones get the new one. If loading fails, the installed
+    state stays as it was and the error is raised. Only one load runs at a
+    time: with wait=False a concurrent call raises ReloadInProgress.
+    """
+    global _attempted_signature
+    if not _load_lock.acquire(blocking=wait):
+        raise ReloadInProgress("A model and dataset reload is already running")
+
+    try:
+        _attempted_signature = artifact_signature()
+        previous = get_predictor()
+        started = time.perf_counter()
+        try:
+            state, phase_times = build_prediction_state()
+        except Exception as e:
+            _load_status['last_error'] = f"{type(e).__name__}: {e}"
+            _load_status['last_error_at'] = datetime.now().isoformat()
+            raise
+
+        set_prediction_state(state)
+        phase_times['total'] = time.perf_counter() - started
+
+        _load_status['loads'] += 1
+        _load_status['last_loaded_at'] = datetime.now().isoformat()
+        _load_status['last_error'] = None
+        _load_status['last_error_at'] = None
+
+        print(f"Installed model version {state.predictor.model_version}")
+        return {
+            'model_version': state.predictor.model_version,
+            'previous_model_version': previous.model_version if previous is not None else None,
+            'timings': {phase: round(seconds, 3) for phase, seconds in phase_times.items()}
+        }
+    finally:
+        _load_lock.release()
+
+def get_load_status() -> Dict:
+    """Load counters and the last error, exposed on the model status endpoint."""
+    return dict(_load_status, reload_in_progress=_load_lock.locked())
+
+def artifact_signature() -> Dict[str, Optional[Tuple[int, int]]]:
+    """(mtime_ns, size) of every file a state is built from; None for missing files."""
+    signature = {}
+    for path in [*MODEL_FILES.values(), *DATASET_FILES.values(), *METHOD_FEATURE_FILES,
+                 str(settings.fighter_snapshots_path), str(Path(settings.dataset_cache_dir) / 'manifest.json')]:
+        try:
+            stat = Path(path).stat()
+            signature[path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature[path] = None
+    return signature
+
+async def watch_artifacts(interval_seconds: float) -> None:
+    """
+    Poll the artifact files and reload when they differ from what the last
+    load read. A change is acted on only once two polls agree, so a file that
+    is still being copied in is not loaded half-written, and each set of
+    files is tried once: after a failed load the watcher waits for the next
+    change instead of retrying the same broken files.
+    """
+    pending = None
+    while True:
+        await asyncio.sleep(interval_seconds)
+        attempted = _attempted_signature
+        current = artifact_signature()
+        if attempted is None or current == attempted:
+            # Nothing loaded yet (startup still running), or nothing new
+            pending = None
+            continue
+        if current != pending:
+            pending = current
+            continue
+
+        changed = sorted(path for path in current if current[path] != attempted.get(path))
+        print(f"Artifacts changed ({', '.join(changed)}); reloading models and datasets")
+        pending = None
+        try:
+            await asyncio.to_thread(reload_prediction_state)
+        except ReloadInProgress:
+            # Another load is running; look again on the next poll
+            continue
+        except Exception as e:
+            print(f"Reload failed, still serving the previous models: {type(e).__name__}: {e}")
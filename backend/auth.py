@@ -2,6 +2,8 @@ from datetime import datetime, timedelta, timezone
 from typing import Union
 import jwt
 from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from models import User
 
@@ -25,6 +27,11 @@ def get_user_by_username(db: Session, username: str):
     """Get user by username from database."""
     return db.query(User).filter(User.username == username).first()
 
+async def get_user_by_username_async(db: AsyncSession, username: str):
+    """Get user by username through an async session."""
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
+
 def authenticate_user(db: Session, username: str, password: str):
     """Authenticate user credentials."""
     user = get_user_by_username(db, username)
@@ -47,13 +54,30 @@ def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str):
-    """Verify JWT token and return username."""
+def create_user_access_token(user: User, expires_delta: Union[timedelta, None] = None):
+    """
+    Access token for user. Besides the username ("sub") it carries the user
+    id ("uid") and active flag ("active"), so requests can be authenticated
+    from the token alone without loading the user.
+    """
+    return create_access_token(
+        data={"sub": user.username, "uid": user.id, "active": bool(user.is_active)},
+        expires_delta=expires_delta
+    )
+
+def verify_token_claims(token: str):
+    """Verify JWT token and return its claims, or None if it is invalid or expired."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+        if payload.get("sub") is None:
             return None
-        return username
+        return payload
     except jwt.PyJWTError:
         return None
+
+def verify_token(token: str):
+    """Verify JWT token and return username."""
+    payload = verify_token_claims(token)
+    if payload is None:
+        return None
+    return payload["sub"]
@@ -0,0 +1,81 @@
+"""
+Concurrency benchmark for the database-backed event routes.
+
+Start the API (e.g. `uvicorn main:app --workers 1`), then run from the
+backend directory:
+
+    python bench_db_concurrency.py --username USER --password PASS \
+        [--url http://localhost:8000] [--path /api/events] \
+        [--concurrency 1,8,32,128] [--requests 500]
+
+Logs in once, then for each concurrency level keeps that many GET requests
+in flight until --requests have completed, and prints throughput and
+latency percentiles. --path /api/public-events needs no login. With the
+blocking driver every request holds the event loop for its whole query, so
+throughput stays flat as concurrency grows; with the async session it
+should scale until the connection pool (db_pool_size + db_max_overflow) or
+the database is saturated. Needs httpx.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+async def run_level(client, path, headers, concurrency, total):
+    latencies = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"  {concurrency:5d} {len(latencies) / elapsed:9.1f} req/s  "
+          f"p50 {percentile(latencies, 0.50) * 1000:7.1f} ms  "
+          f"p95 {percentile(latencies, 0.95) * 1000:7.1f} ms  "
+          f"p99 {percentile(latencies, 0.99) * 1000:7.1f} ms  errors {errors}")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8000', help='base URL of the running API')
+    parser.add_argument('--path', default='/api/events', help='GET endpoint to load')
+    parser.add_argument('--username', help='user to log in as (needed for authenticated paths)')
+    parser.add_argument('--password')
+    parser.add_argument('--concurrency', default='1,8,32,128', help='comma-separated in-flight request counts')
+    parser.add_argument('--requests', type=int, default=500, help='requests per concurrency level')
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(',')]
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        headers = {}
+        if args.username:
+            response = await client.post('/login', data={'username': args.username, 'password': args.password})
+            response.raise_for_status()
+            headers['Authorization'] = f"Bearer {response.json()['access_token']}"
+
+        # Warm up connections, the pool and any caches before measuring
+        await client.get(args.path, headers=headers)
+
+        print(f"GET {args.url}{args.path}, {args.requests} requests per level")
+        print("  concurrency   throughput")
+        for concurrency in levels:
+            await run_level(client, args.path, headers, concurrency, args.requests)
+
+if __name__ == '__main__':
+    asyncio.run(main())
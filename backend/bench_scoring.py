@@ -0,0 +1,64 @@
+"""
+Single-row scoring benchmark and parity check for the prediction engines.
+
+Run from the backend directory:
+
+    python bench_scoring.py [--rows 2000] [--repeat 2000] [--tolerance 1e-6]
+
+For each model, scores probe rows (built from the model's own split
+thresholds) with XGBClassifier.predict_proba, the inplace_predict scorer and
+the compiled NumPy trees, prints the largest probability difference and the
+per-row latency of each, and exits non-zero if an engine differs from
+predict_proba by more than --tolerance.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import xgboost as xgb
+
+from app.services.scoring import BoosterScorer, CompiledTreeEnsemble
+
+MODEL_FILES = {
+    'main': 'data/xgb_model_good.json',
+    'p1_method': 'data/p1_method_target_xgboost_model.json',
+    'p2_method': 'data/p2_method_target_xgboost_model.json'
+}
+
+def time_per_call_us(fn, row, repeat):
+    fn(row)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(row)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000, help='probe rows per model for the parity check')
+    parser.add_argument('--repeat', type=int, default=2000, help='single-row calls per latency measurement')
+    parser.add_argument('--tolerance', type=float, default=1e-6, help='largest allowed probability difference')
+    args = parser.parse_args()
+
+    failures = []
+    for name, path in MODEL_FILES.items():
+        model = xgb.XGBClassifier()
+        model.load_model(path)
+        engines = {'sklearn': model, 'inplace': BoosterScorer(model), 'compiled': CompiledTreeEnsemble(model)}
+
+        rows = engines['compiled'].probe_rows(args.rows)
+        reference = model.predict_proba(rows)
+        print(f"{name} ({engines['compiled'].roots.size} trees, depth {engines['compiled'].max_depth})")
+        for engine, scorer in engines.items():
+            max_diff = float(np.abs(scorer.predict_proba(rows) - reference).max())
+            latency = time_per_call_us(scorer.predict_proba, rows[:1], args.repeat)
+            print(f"  {engine:9s} {latency:8.1f} us/row  max |diff| {max_diff:.2e}")
+            if max_diff > args.tolerance:
+                failures.append(f"{name}/{engine} differs from predict_proba by {max_diff:.2e}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Import-time benchmark for the API process.
+
+Run from the backend directory:
+
+    python bench_startup.py [--runs 3] [--budget-ms 1500] [--top 15]
+
+Imports main in fresh interpreters under `python -X importtime`, prints the
+slowest top-level imports and exits non-zero if a heavy ML library is
+imported eagerly or the best total exceeds --budget-ms. Heavy libraries are
+loaded by the lifespan's background loading, not by `import main`.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+# Must not be imported by `import main`
+LAZY_MODULES = ['xgboost', 'sklearn', 'scipy', 'shap', 'matplotlib']
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+def measure_imports(target: str = 'main'):
+    """Return {module: (cumulative_us, depth)} for one fresh `import target`."""
+    env = dict(os.environ)
+    # Importing main builds the database engines, so give it a throwaway database unless one is configured
+    env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_startup.db')}")
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+        capture_output=True, text=True, env=env
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{result.stderr[-2000:]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative, indent, module = int(match.group(2)), match.group(3), match.group(4)
+            timings[module] = (cumulative, len(indent) // 2)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3, help='fresh interpreters to measure; the fastest is reported')
+    parser.add_argument('--budget-ms', type=float, default=None, help='fail if `import main` takes longer')
+    parser.add_argument('--top', type=int, default=15, help='slowest top-level imports to list')
+    args = parser.parse_args()
+
+    runs = [measure_imports() for _ in range(args.runs)]
+    best = min(runs, key=lambda timings: timings['main'][0])
+    total_ms = best['main'][0] / 1000
+
+    print(f"import main: {total_ms:.0f} ms (best of {args.runs})")
+    direct = sorted(
+        ((us, module) for module, (us, depth) in best.items() if depth == 1),
+        reverse=True
+    )
+    for us, module in direct[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {module}")
+
+    failures = []
+    eager = sorted({module.split('.')[0] for module in best} & set(LAZY_MODULES))
+    if eager:
+        failures.append(f"heavy modules imported eagerly: {', '.join(eager)}")
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        failures.append(f"import main took {total_ms:.0f} ms, budget is {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Offline build step for the binary dataset cache.
+
+Run from the backend directory after updating either CSV in data/:
+
+    python build_dataset_cache.py
+
+The API memory-maps the result at startup and reads the CSVs instead if
+the cache is missing or its manifest lists different source hashes.
+"""
+import time
+
+from app.core.config import settings
+from app.services.dataset_cache import build_dataset_cache
+
+DATASET_FILES = {
+    'ufc_data': 'data/ufc_cleaned.csv',
+    'fighters': 'data/ufc_fighters_cleaned.csv'
+}
+
+def main():
+    start = time.perf_counter()
+    manifest = build_dataset_cache(DATASET_FILES, settings.dataset_cache_dir)
+
+    print(f"Wrote dataset cache (format {manifest['format_version']}) for "
+          f"{', '.join(manifest['sources'])} to {settings.dataset_cache_dir} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Offline build step for the fighter feature snapshot store.
+
+Run from the backend directory after updating data/ufc_cleaned.csv:
+
+    python build_feature_snapshots.py
+
+The API loads the result at startup and falls back to live computation
+if the file is missing or was built from a different CSV.
+"""
+import time
+
+import pandas as pd
+import xgboost as xgb
+
+from app.core.config import settings
+from app.core.globals import set_models, set_datasets
+from app.services.feature_snapshots import build_fighter_snapshots, file_digest
+from app.services.predictor import UFCPredictor
+
+UFC_DATA_PATH = 'data/ufc_cleaned.csv'
+FIGHTERS_PATH = 'data/ufc_fighters_cleaned.csv'
+
+def load_predictor():
+    """Load models and datasets the same way the API lifespan does."""
+    models = {}
+    for model_name, model_path in {
+        'main': 'data/xgb_model_good.json',
+        'p1_method': 'data/p1_method_target_xgboost_model.json',
+        'p2_method': 'data/p2_method_target_xgboost_model.json'
+    }.items():
+        model = xgb.XGBClassifier()
+        model.load_model(model_path)
+        models[model_name] = model
+    set_models(models)
+
+    set_datasets({
+        'ufc_data': pd.read_csv(UFC_DATA_PATH),
+        'fighters': pd.read_csv(FIGHTERS_PATH)
+    })
+    return UFCPredictor()
+
+def main():
+    start = time.perf_counter()
+    predictor = load_predictor()
+
+    snapshots = build_fighter_snapshots(predictor, file_digest(UFC_DATA_PATH))
+    snapshots.save(settings.fighter_snapshots_path)
+
+    print(f"Wrote {len(snapshots.as_of)} snapshots for {len(snapshots.names)} fighters "
+          f"to {settings.fighter_snapshots_path} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
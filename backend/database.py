@@ -1,10 +1,14 @@
 # database.py
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
+from app.core.config import settings
+
 load_dotenv()
 
 # PostgreSQL database URL
@@ -13,6 +17,43 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def async_database_url(url: str):
+    """The same database through an asyncio driver: asyncpg for Postgres, aiosqlite for SQLite."""
+    url = make_url(url)
+    if url.get_backend_name() == 'postgresql':
+        return url.set(drivername='postgresql+asyncpg')
+    if url.get_backend_name() == 'sqlite':
+        return url.set(drivername='sqlite+aiosqlite')
+    return url
+
+def create_async_db_engine(url: str):
+    url = async_database_url(url)
+    if url.get_backend_name() != 'postgresql':
+        # SQLite (local development) keeps SQLAlchemy's default pool for it
+        return create_async_engine(url)
+
+    connect_args = {}
+    # libpq's ?sslmode= is not an asyncpg connect argument; asyncpg takes the same modes as ssl=
+    sslmode = url.query.get('sslmode')
+    if sslmode is not None:
+        url = url.difference_update_query(['sslmode'])
+        connect_args['ssl'] = sslmode
+    if settings.db_statement_timeout_ms > 0:
+        # Applied by the server to every statement on these connections
+        connect_args['server_settings'] = {'statement_timeout': str(settings.db_statement_timeout_ms)}
+    return create_async_engine(
+        url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=connect_args
+    )
+
+async_engine = create_async_db_engine(DATABASE_URL)
+# Objects stay readable after commit, since lazy refreshes can't run outside an await
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -21,3 +62,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,88 +1,112 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from pydantic import BaseModel
 import os
+import time
+import asyncio
 from app.routes import general
 RENDER_FRONTEND_URL = os.getenv("RENDER_FRONTEND_URL", "")
 
 # Add these new imports for UFC prediction functionality
 from contextlib import asynccontextmanager
-import pandas as pd
-import xgboost as xgb
-from pathlib import Path
 
-from database import get_db, engine
+from database import get_db, engine, async_engine
 from models import Base, User, Event, Match
 from auth import (
     authenticate_user, 
-    create_access_token, 
+    create_user_access_token, 
     verify_token, 
     get_user_by_username,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 
 # Import the moved dependency
-from app.core.auth_dependencies import get_current_user
+from app.core.auth_dependencies import TokenUser, get_current_db_user, get_current_user
 
 # Add these imports for UFC prediction routes
-from app.core.globals import set_models, set_datasets
-from app.routes import predictions, events
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-# Lifespan function for loading UFC models and datasets
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup: Load models and datasets
+from app.core.globals import set_startup_complete
+from app.services.state_loader import reload_prediction_state, watch_artifacts
+from app.core.config import settings
+from app.core.executor import shutdown_prediction_executor
+from app.core.query_stats import instrument_engine, track_queries
+from app.services.shap_renderer import get_shap_render_pool, shutdown_shap_render_pool
+from app.services.public_events_cache import get_public_events_cache
+from app.routes import predictions, events, admin
+
+def load_prediction_state():
+    """Load models, datasets and snapshots, install them and warm the SHAP renderers."""
     print("Loading UFC models and datasets...")
+    startup_start = time.perf_counter()
+    phase_times = {}
     
     try:
-        # Load XGBoost models
-        models = {}
-        model_files = {
-            'main': 'data/xgb_model_good.json',
-            'p1_method': 'data/p1_method_target_xgboost_model.json',
-            'p2_method': 'data/p2_method_target_xgboost_model.json'
-        }
-        
-        for model_name, model_path in model_files.items():
-            if Path(model_path).exists():
-                model = xgb.XGBClassifier()
-                model.load_model(model_path)
-                models[model_name] = model
-                print(f"Loaded {model_name} model")
+        # The first load is the same build-then-swap a hot reload does
+        loaded = reload_prediction_state(wait=True)
+        phase_times.update((phase, seconds) for phase, seconds in loaded['timings'].items() if phase != 'total')
         
-        set_models(models)
-        
-        # Load CSV datasets
-        datasets = {}
-        dataset_files = {
-            'ufc_data': 'data/ufc_cleaned.csv',
-            'fighters': 'data/ufc_fighters_cleaned.csv'
-        }
-        
-        for dataset_name, dataset_path in dataset_files.items():
-            if Path(dataset_path).exists():
-                dataset = pd.read_csv(dataset_path)
-                datasets[dataset_name] = dataset
-                print(f"Loaded {dataset_name} dataset with {len(dataset)} rows")
-        
-        set_datasets(datasets)
+        # Start the SHAP renderer processes so they import matplotlib before the first request
+        phase_start = time.perf_counter()
+        get_shap_render_pool().warm_up()
+        print(f"Started {settings.shap_render_processes} SHAP renderer processes")
+        phase_times['shap_renderers'] = time.perf_counter() - phase_start
         
         print("All UFC models and datasets loaded successfully!")
         
     except Exception as e:
         print(f"Error loading UFC models/datasets: {e}")
         # Continue anyway - your auth system will still work
+    finally:
+        set_startup_complete()
+    
+    phase_times['total'] = time.perf_counter() - startup_start
+    print("Startup timing: " + ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in phase_times.items()))
+
+# Lifespan function for loading UFC models and datasets
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup work lives here, not at import time: SHAP renderer processes are
+    # spawned and re-import the parent's __main__ (this file under `python main.py`)
+    
+    # Create database tables
+    Base.metadata.create_all(bind=engine)
+    
+    if settings.db_query_stats_enabled:
+        instrument_engine(engine)
+        instrument_engine(async_engine.sync_engine)
+    
+    # Fail at startup, not on every request, if the shared cache backend is unusable
+    if settings.public_events_cache_enabled:
+        get_public_events_cache()
+    
+    # Load models and datasets
+    loading = None
+    if settings.load_models_in_background:
+        # Start serving auth and event routes right away; prediction routes
+        # answer 503 until loading finishes
+        loading = asyncio.create_task(asyncio.to_thread(load_prediction_state))
+    else:
+        load_prediction_state()
+    
+    # Optional file-watch mode: reload when model or dataset files change on disk
+    watcher = None
+    if settings.reload_watch_interval_seconds > 0:
+        watcher = asyncio.create_task(watch_artifacts(settings.reload_watch_interval_seconds))
+        print(f"Watching model and dataset files every {settings.reload_watch_interval_seconds}s")
     
     yield
     
     # Shutdown
     print("Shutting down...")
+    if watcher is not None:
+        watcher.cancel()
+    if loading is not None:
+        await loading
+    shutdown_prediction_executor()
+    shutdown_shap_render_pool()
+    await async_engine.dispose()
 
 # Create FastAPI app with lifespan
 app = FastAPI(title="UFC Predictions API with Dashboard", lifespan=lifespan)
@@ -104,8 +128,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag",  # public-events paging and validators
+                    "X-DB-Query-Count", "X-DB-Query-Time-Ms", "Server-Timing"],
 )
 
+if settings.db_query_stats_enabled:
+    # The engines are instrumented in lifespan
+    @app.middleware("http")
+    async def query_stats_headers(request: Request, call_next):
+        """Report how many statements a request ran and how long they took."""
+        with track_queries() as stats:
+            response = await call_next(request)
+        response.headers['X-DB-Query-Count'] = str(stats.count)
+        response.headers['X-DB-Query-Time-Ms'] = f"{stats.seconds * 1000:.1f}"
+        response.headers.append('Server-Timing', stats.server_timing())
+        return response
+
 # Pydantic models
 class Token(BaseModel):
     access_token: str
@@ -131,19 +169,17 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
         )
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
+    access_token = create_user_access_token(user, expires_delta=access_token_expires)
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
-    """Get current user information."""
+async def get_current_user_info(current_user: User = Depends(get_current_db_user)):
+    """Get current user information (read from the database, not the token)."""
     return current_user
 
 @app.get("/dashboard")
-async def dashboard(current_user: User = Depends(get_current_user)):
+async def dashboard(current_user: TokenUser = Depends(get_current_user)):
     """Protected dashboard endpoint."""
     return {"message": f"Welcome to dashboard, {current_user.username}!"}
 
@@ -171,6 +207,12 @@ try:
 except Exception as e:
     print(f"Could not add events routes: {e}")
 
+try:
+    app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+    print("Admin routes added successfully")
+except Exception as e:
+    print(f"Could not add admin routes: {e}")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
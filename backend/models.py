@@ -28,9 +28,10 @@ class Event(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
-    # Relationships - ADD lazy='joined' for eager loading
+    # Relationships - matches load only when a query asks (selectinload) or on first access;
+    # a joined load here made every event lookup pull all its matches
     user = relationship("User", back_populates="events")
-    matches = relationship("Match", back_populates="event", cascade="all, delete-orphan", lazy='joined')
+    matches = relationship("Match", back_populates="event", cascade="all, delete-orphan", lazy='select')
 
 class Match(Base):
     __tablename__ = "matches"
@@ -0,0 +1,107 @@
+# conftest.py
+import datetime as dt
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Route tests run against a throwaway SQLite database; set before database.py is imported
+os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp(prefix='ufc-tests-')}/test.db"
+
+from app.core.fight_stats import stat_columns
+
+def make_fights(bouts, seed=0):
+    """
+    Cleaned-CSV-shaped DataFrame from (p1, p2, event_date, winner, method)
+    tuples, listed like the real CSV (later bouts first), with random stats.
+    """
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(bouts, columns=['p1_fighter', 'p2_fighter', 'event_date', 'winner', 'method'])
+    frame['event_date'] = pd.to_datetime(frame['event_date'])
+    for prefix in ('p1', 'p2'):
+        columns = stat_columns(prefix)
+        stats = pd.DataFrame(rng.uniform(0, 10, (len(frame), len(columns))).round(2), columns=columns)
+        frame = pd.concat([frame, stats], axis=1)
+    return frame
+
+@pytest.fixture
+def tournament_fights():
+    """
+    A one-night tournament: A beats B in the semifinal and loses the final to
+    C on the same day. As in the CSV, the final (the later bout) comes first.
+    """
+    return make_fights([
+        ('D', 'A', '2001-06-01', 1, 'KO/TKO'),
+        ('C', 'A', '2000-05-01', 1, 'Submission'),
+        ('A', 'B', '2000-05-01', 1, 'Decision - Unanimous'),
+        ('C', 'E', '2000-05-01', 1, 'KO/TKO'),
+        ('A', 'E', '1999-01-01', 1, 'KO/TKO'),
+    ])
+
+@pytest.fixture(scope='session')
+def prediction_state():
+    """The real models and datasets under data/, loaded the way startup loads them."""
+    from app.services.state_loader import MODEL_FILES
+
+    if not (BACKEND_DIR / MODEL_FILES['main']).exists():
+        pytest.skip("needs the trained models under data/")
+
+    from app.services.state_loader import build_prediction_state
+
+    # Artifact paths in the settings are relative to the backend directory
+    cwd = os.getcwd()
+    os.chdir(BACKEND_DIR)
+    try:
+        state, _ = build_prediction_state()
+    finally:
+        os.chdir(cwd)
+    return state
+
+@pytest.fixture(scope='module')
+def client():
+    """TestClient for the app, started through its lifespan, on the test database."""
+    from fastapi.testclient import TestClient
+    from app.core.config import settings
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(settings, 'db_query_stats_enabled', True)
+        patch.setattr(settings, 'shap_render_processes', 0)  # no renderer processes for route tests
+        import main
+        with TestClient(main.app) as test_client:
+            yield test_client
+
+@pytest.fixture(scope='module')
+def user(client, request):
+    """An active user of the test database, one per test module."""
+    from auth import get_password_hash
+    from database import SessionLocal
+    from models import User
+
+    with SessionLocal() as db:
+        user = User(username=request.module.__name__, hashed_password=get_password_hash('pw'), is_active=True)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+
+def add_events(user, n_events, n_matches):
+    """Insert n_events events owned by user, each with n_matches predicted matches."""
+    from database import SessionLocal
+    from models import Event, Match
+
+    with SessionLocal() as db:
+        for i in range(n_events):
+            event = Event(name=f'Event {i}', date=dt.date(2024, 1, 1) + dt.timedelta(days=i), location='Las Vegas', user_id=user.id)
+            db.add(event)
+            db.flush()
+            for _ in range(n_matches):
+                db.add(Match(event_id=event.id, fighter1='A', fighter2='B', odds1='-150', odds2='+130',
+                             referee='Herb Dean', event_date=event.date, prediction_data={'p1_win_prob': 0.6}))
+        db.commit()
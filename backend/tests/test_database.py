@@ -0,0 +1,29 @@
+# test_database.py
+import pytest
+
+import database
+
+@pytest.fixture
+def engine_kwargs(monkeypatch):
+    captured = {}
+
+    def fake_create_async_engine(url, **kwargs):
+        captured.update(kwargs, url=url)
+        return None
+
+    monkeypatch.setattr(database, 'create_async_engine', fake_create_async_engine)
+    return captured
+
+def test_async_url_uses_asyncio_drivers():
+    assert database.async_database_url('postgresql://u:p@db/ufc').drivername == 'postgresql+asyncpg'
+    assert database.async_database_url('sqlite:///./ufc.db').drivername == 'sqlite+aiosqlite'
+
+@pytest.mark.parametrize('sslmode', ['require', 'disable', 'verify-full'])
+def test_sslmode_becomes_the_asyncpg_ssl_argument(engine_kwargs, sslmode):
+    database.create_async_db_engine(f'postgresql://u:p@db/ufc?sslmode={sslmode}')
+    assert 'sslmode' not in engine_kwargs['url'].query
+    assert engine_kwargs['connect_args']['ssl'] == sslmode
+
+def test_no_ssl_argument_without_sslmode(engine_kwargs):
+    database.create_async_db_engine('postgresql://u:p@db/ufc')
+    assert 'ssl' not in engine_kwargs['connect_args']
@@ -0,0 +1,70 @@
+# test_events_queries.py
+"""
+Statements per request for the events routes, read from the X-DB-Query-Count
+header, so a lazy load sneaking back into a loop shows up as a failure.
+"""
+import pytest
+
+from app.core.config import settings
+
+from conftest import add_events
+
+@pytest.fixture(scope='module')
+def headers(client, user):
+    from auth import create_user_access_token
+
+    headers = {'Authorization': f'Bearer {create_user_access_token(user)}'}
+    # The first authenticated request also loads the deactivated users list
+    assert client.get('/api/events', headers=headers).status_code == 200
+    return headers
+
+def query_count(response):
+    assert response.status_code == 200, response.text
+    return int(response.headers['X-DB-Query-Count'])
+
+def test_list_events_runs_a_fixed_number_of_queries(client, user, headers):
+    add_events(user, 2, 1)
+    few = client.get('/api/events', headers=headers)
+    add_events(user, 30, 4)
+    many = client.get('/api/events', headers=headers)
+
+    assert len(many.json()) == len(few.json()) + 30
+    # Events, then all their matches in one query
+    assert query_count(few) == query_count(many) == 2
+
+def test_update_event_does_not_scale_with_matches(client, user, headers):
+    events = client.get('/api/events', headers=headers).json()
+    empty = client.post('/api/events', headers=headers, json={'name': 'Empty', 'date': '2025-01-01'}).json()
+    full = next(event for event in events if len(event['matches']) == 4)
+
+    counts = []
+    for event in (empty, full):
+        response = client.put(f"/api/events/{event['id']}", headers=headers,
+                              json={'name': event['name'] + ' (renamed)', 'date': event['date']})
+        counts.append(query_count(response))
+        assert response.json()['name'].endswith('(renamed)')
+    assert counts[0] == counts[1]
+
+def test_delete_event_does_not_scale_with_matches(client, user, headers):
+    events = client.get('/api/events', headers=headers).json()
+    one = next(event for event in events if len(event['matches']) == 1)
+    four = next(event for event in events if len(event['matches']) == 4)
+
+    counts = [query_count(client.delete(f"/api/events/{event['id']}", headers=headers)) for event in (one, four)]
+    assert counts[0] == counts[1]
+    assert client.delete(f"/api/events/{four['id']}", headers=headers).status_code == 404
+
+def test_public_events_queries(client, user, monkeypatch):
+    add_events(user, 3, 2)
+
+    # Served from the in-memory snapshot once it is warm
+    client.get('/api/public-events')
+    assert query_count(client.get('/api/public-events')) == 0
+    assert query_count(client.get('/api/public-events', params={'limit': 5})) == 0
+
+    # Straight from the database: fingerprint, events and their matches, whatever the page size
+    monkeypatch.setattr(settings, 'public_events_cache_enabled', False)
+    small = client.get('/api/public-events', params={'limit': 2})
+    large = client.get('/api/public-events', params={'limit': 50})
+    assert len(large.json()) > len(small.json())
+    assert query_count(small) == query_count(large)
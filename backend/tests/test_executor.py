@@ -0,0 +1,78 @@
+# test_executor.py
+import asyncio
+import threading
+
+import pytest
+
+from app.core.executor import ExecutorSaturated, PredictionExecutor
+
+def test_cancelled_caller_keeps_the_slot_until_the_task_finishes():
+    executor = PredictionExecutor(max_workers=1, max_queue=0)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return 'done'
+
+    async def scenario():
+        caller = asyncio.create_task(executor.run(blocking))
+        await asyncio.to_thread(started.wait, 5)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+
+        # The task is still running, so the only slot is still taken
+        assert executor.stats()['in_flight'] == 1
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(lambda: None)
+
+        release.set()
+        await asyncio.to_thread(executor._pool.submit(lambda: None).result, 5)
+        assert executor.stats()['in_flight'] == 0
+        result, timings = await executor.run(lambda: 42)
+        assert result == 42 and 'execution_ms' in timings
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        executor.shutdown()
+
+def test_queued_task_cancelled_before_it_starts_frees_its_slot():
+    executor = PredictionExecutor(max_workers=1, max_queue=1)
+    started, release = threading.Event(), threading.Event()
+    ran = []
+
+    def blocking():
+        started.set()
+        release.wait(5)
+
+    async def scenario():
+        running = asyncio.create_task(executor.run(blocking))
+        await asyncio.to_thread(started.wait, 5)
+        queued = asyncio.create_task(executor.run(ran.append, 'queued'))
+        await asyncio.sleep(0)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert executor.stats()['in_flight'] == 1
+
+        release.set()
+        await running
+        assert executor.stats()['in_flight'] == 0
+        assert ran == []
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        executor.shutdown()
+
+def test_failed_submission_frees_its_slot():
+    executor = PredictionExecutor(max_workers=1, max_queue=0)
+    executor.shutdown()
+    with pytest.raises(RuntimeError):
+        asyncio.run(executor.run(lambda: None))
+    assert executor.stats()['in_flight'] == 0
+    assert executor._slots.acquire(blocking=False)
@@ -0,0 +1,36 @@
+# test_feature_layout.py
+import numpy as np
+import pytest
+
+from app.services.feature_layout import FeatureLayout
+
+def test_compile_drops_names_the_model_does_not_use():
+    layout = FeatureLayout(['b', 'a', 'c'])
+    compiled = layout.compile(['a', 'unused', 'b'])
+    row = layout.new_row()
+    layout.write(row, compiled, [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(row[:2], [3.0, 1.0])
+    assert np.isnan(row[2])
+
+def test_check_coverage_rejects_unwritten_features():
+    layout = FeatureLayout(['a', 'b', 'c'])
+    layout.check_coverage([layout.compile(['a', 'b']), layout.compile(['c'])])
+    with pytest.raises(ValueError, match="'c'"):
+        layout.check_coverage([layout.compile(['a', 'b'])])
+
+def test_predictor_slots_cover_every_model_feature(prediction_state):
+    predictor = prediction_state.predictor
+    assert predictor.feature_layout.size == len(predictor.main_feature_names)
+    for target_model in ('p1_method', 'p2_method'):
+        if predictor.method_feature_lists[target_model] is not None:
+            assert len(predictor.method_feature_indices[target_model]) == len(predictor.method_feature_lists[target_model])
+
+def test_predictor_load_fails_when_a_feature_has_no_producer(prediction_state):
+    predictor = prediction_state.predictor
+    predictor.feature_layout = FeatureLayout(predictor.main_feature_names + ['unknown_feature'])
+    try:
+        with pytest.raises(ValueError, match='unknown_feature'):
+            predictor.compile_feature_slots()
+    finally:
+        predictor.feature_layout = FeatureLayout(predictor.main_feature_names)
+        predictor.compile_feature_slots()
@@ -0,0 +1,31 @@
+# test_fight_store.py
+import numpy as np
+import pandas as pd
+
+from app.core.fight_store import FightStore
+
+def test_same_day_bouts_treat_earlier_row_as_most_recent(tournament_fights):
+    store = FightStore.from_dataframe(tournament_fights)
+    span = store.appearances('A')
+
+    # Oldest first: 1999 bout, then the semifinal (row 2) before the final (row 1), then 2001
+    assert store.appearance_rows[span].tolist() == [4, 2, 1, 0]
+    assert store.appearance_won[span].tolist() == [True, True, False, False]
+
+def test_recent_stats_after_same_day_bouts(tournament_fights):
+    store = FightStore.from_dataframe(tournament_fights)
+    prior = store.count_before('A', pd.Timestamp('2000-06-01'))
+    assert prior == 3
+
+    recent = store.recent_stats('A', prior)
+    # Most recent first: the final (A as p2), the semifinal (A as p1), the 1999 bout
+    expected = np.stack([store.p2_stats[1], store.p1_stats[2], store.p1_stats[4]])
+    np.testing.assert_array_equal(recent, expected)
+
+def test_same_day_order_survives_save_and_load(tournament_fights, tmp_path):
+    store = FightStore.from_dataframe(tournament_fights)
+    metadata = store.save(tmp_path)
+    loaded = FightStore.load(tmp_path, metadata)
+
+    np.testing.assert_array_equal(loaded.appearance_rows, store.appearance_rows)
+    np.testing.assert_array_equal(loaded.appearance_won, store.appearance_won)
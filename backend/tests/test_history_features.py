@@ -0,0 +1,203 @@
+# test_history_features.py
+"""
+Parity of the vectorized history features (FightStore + recent_weighted_average,
+and the snapshots built from them) with the original iterrows implementation.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.fight_stats import EMA_FEATURES, recent_weighted_average
+from app.core.fight_store import METHOD_GROUPS, METHOD_MAPPING, FightStore
+from app.services.feature_snapshots import build_fighter_snapshots
+from app.services.predictor import UFCPredictor
+
+from conftest import BACKEND_DIR, make_fights
+
+# Reference: the per-request pandas implementation the fight store replaced
+
+def reference_record(df, fighter_name, event_date):
+    date_mask = df['event_date'] < event_date
+    p1_fights = df[(df['p1_fighter'] == fighter_name) & date_mask]
+    p2_fights = df[(df['p2_fighter'] == fighter_name) & date_mask]
+    wins = len(p1_fights[p1_fights['winner'] == 1]) + len(p2_fights[p2_fights['winner'] == 0])
+    losses = len(p1_fights[p1_fights['winner'] == 0]) + len(p2_fights[p2_fights['winner'] == 1])
+    return wins, losses, wins + losses
+
+def reference_win_streak(df, fighter_name, event_date):
+    fighter_mask = (df['p1_fighter'] == fighter_name) | (df['p2_fighter'] == fighter_name)
+    past_fights = df[fighter_mask & (df['event_date'] < event_date)].sort_values('event_date', ascending=False)
+
+    win_streak = 0
+    for _, fight in past_fights.iterrows():
+        is_winner = ((fight['p1_fighter'] == fighter_name and fight['winner'] == 1) or
+                     (fight['p2_fighter'] == fighter_name and fight['winner'] == 0))
+        if not is_winner:
+            break
+        win_streak += 1
+    return win_streak
+
+def reference_days_since_last_fight(df, fighter_name, event_date):
+    fighter_mask = (df['p1_fighter'] == fighter_name) | (df['p2_fighter'] == fighter_name)
+    past_fights = df[fighter_mask & (df['event_date'] < event_date)]
+    if past_fights.empty:
+        return None
+    return (event_date - past_fights['event_date'].max()).days
+
+def reference_ema_features(df, fighter_name, event_date):
+    fighter_mask = (df['p1_fighter'] == fighter_name) | (df['p2_fighter'] == fighter_name)
+    prev_fights = df[fighter_mask & (df['event_date'] < event_date)].sort_values('event_date', ascending=False).head(3)
+
+    feature_values = {feat: [] for feat in EMA_FEATURES}
+    for _, fight in prev_fights.iterrows():
+        prefix = 'p1_' if fight['p1_fighter'] == fighter_name else 'p2_'
+        for feat in EMA_FEATURES:
+            value = fight[f'{prefix}{feat}']
+            if not pd.isna(value):
+                feature_values[feat].append(pd.to_numeric(value, errors='coerce'))
+
+    emas = {}
+    for feat, values in feature_values.items():
+        if len(values) == 1:
+            emas[feat] = values[0]
+        elif len(values) == 2:
+            emas[feat] = 0.6 * values[0] + 0.4 * values[1]
+        elif len(values) >= 3:
+            emas[feat] = 0.5 * values[0] + 0.3 * values[1] + 0.2 * values[2]
+        else:
+            emas[feat] = np.nan
+    return emas
+
+def reference_method_wins(df, fighter_name):
+    temp_method = df['method'].replace(METHOD_MAPPING)
+    win_mask = ((df['p1_fighter'] == fighter_name) & (df['winner'] == 1)) | \
+               ((df['p2_fighter'] == fighter_name) & (df['winner'] == 0))
+    win_fights = temp_method[win_mask]
+    return {method: int((win_fights == method).sum()) for method in METHOD_GROUPS}
+
+# Helpers
+
+def history_predictor(df):
+    """A UFCPredictor with only the fight store behind it: enough for the history features."""
+    predictor = UFCPredictor.__new__(UFCPredictor)
+    predictor.fight_store = FightStore.from_dataframe(df)
+    predictor.fighter_snapshots = None
+    return predictor
+
+def probe_dates(df, fighter_name):
+    """Each of the fighter's fight dates, the day after each, and dates before and after their career."""
+    fighter_mask = (df['p1_fighter'] == fighter_name) | (df['p2_fighter'] == fighter_name)
+    days = pd.to_datetime(df.loc[fighter_mask, 'event_date'].unique())
+    return sorted(set(days) | set(days + pd.Timedelta(days=1)) |
+                  {days.min() - pd.Timedelta(days=30), days.max() + pd.Timedelta(days=400)})
+
+def assert_history_matches(df, predictor, fighter_name, event_date):
+    context = f"{fighter_name} before {event_date.date()}"
+    assert predictor.calculate_fighter_record(fighter_name, event_date) == \
+        reference_record(df, fighter_name, event_date), context
+    assert predictor.calculate_win_streak(fighter_name, event_date) == \
+        reference_win_streak(df, fighter_name, event_date), context
+    assert predictor.calculate_days_since_last_fight(fighter_name, event_date) == \
+        reference_days_since_last_fight(df, fighter_name, event_date), context
+
+    expected = reference_ema_features(df, fighter_name, event_date)
+    actual = predictor.calculate_ema_features(fighter_name, event_date)
+    np.testing.assert_allclose(
+        [actual[feat] for feat in EMA_FEATURES], [expected[feat] for feat in EMA_FEATURES],
+        rtol=1e-6, equal_nan=True, err_msg=context
+    )
+
+@pytest.fixture
+def synthetic_fights():
+    """Fights with missing stats, one-night tournaments and fighters on both corners."""
+    df = make_fights([
+        ('A', 'F', '2003-01-01', 0, 'Decision - Split'),
+        ('B', 'A', '2002-03-01', 1, 'Submission'),
+        ('A', 'C', '2002-03-01', 1, 'KO/TKO'),
+        ('D', 'B', '2002-03-01', 0, 'KO/TKO'),
+        ('A', 'D', '2001-01-01', 0, 'DQ'),
+        ('E', 'A', '2000-06-01', 0, "TKO - Doctor's Stoppage"),
+        ('C', 'A', '2000-01-01', 1, 'Decision - Unanimous'),
+        ('E', 'F', '2000-01-01', 1, 'Decision - Majority'),
+    ], seed=1)
+    rng = np.random.default_rng(2)
+    stats = [c for c in df.columns if c.startswith(('p1_', 'p2_')) and c not in ('p1_fighter', 'p2_fighter')]
+    # Scatter missing values, plus a bout with no stats at all for one corner
+    df[stats] = df[stats].mask(rng.random((len(df), len(stats))) < 0.25)
+    df.loc[2, [c for c in stats if c.startswith('p1_')]] = np.nan
+    return df
+
+# Tests
+
+def test_recent_weighted_average_matches_reference_weights():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n_bouts = rng.integers(0, 4)
+        recent = rng.uniform(0, 10, (n_bouts, 5))
+        recent[rng.random(recent.shape) < 0.3] = np.nan
+
+        values = recent_weighted_average(recent) if n_bouts else np.full(5, np.nan)
+        for col in range(5):
+            present = [v for v in recent[:, col] if not np.isnan(v)]
+            weights = {0: [], 1: [1.0], 2: [0.6, 0.4], 3: [0.5, 0.3, 0.2]}[len(present)]
+            expected = sum(w * v for w, v in zip(weights, present)) if present else np.nan
+            np.testing.assert_allclose(values[col], expected, equal_nan=True)
+
+def test_recent_weighted_average_stacked_rows():
+    rng = np.random.default_rng(1)
+    recent = rng.uniform(0, 10, (3, 4, 6))
+    recent[rng.random(recent.shape) < 0.4] = np.nan
+    stacked = recent_weighted_average(recent)
+    for row in range(4):
+        np.testing.assert_array_equal(stacked[row], recent_weighted_average(recent[:, row]))
+
+def test_history_features_match_reference(synthetic_fights):
+    predictor = history_predictor(synthetic_fights)
+    for fighter_name in 'ABCDEF':
+        for event_date in probe_dates(synthetic_fights, fighter_name):
+            assert_history_matches(synthetic_fights, predictor, fighter_name, event_date)
+
+def test_win_streak_after_tournament_loss(tournament_fights):
+    # Won the semifinal, then lost the final the same night: no streak
+    predictor = history_predictor(tournament_fights)
+    assert predictor.calculate_win_streak('A', pd.Timestamp('2000-06-01')) == 0
+    assert reference_win_streak(tournament_fights, 'A', pd.Timestamp('2000-06-01')) == 0
+
+def test_method_wins_match_reference(synthetic_fights):
+    predictor = history_predictor(synthetic_fights)
+    for fighter_name in 'ABCDEF':
+        assert predictor.calculate_method_wins(fighter_name) == reference_method_wins(synthetic_fights, fighter_name)
+
+def test_snapshots_match_live_features(synthetic_fights):
+    predictor = history_predictor(synthetic_fights)
+    snapshots = build_fighter_snapshots(predictor, source_digest='test')
+    snapshot_predictor = history_predictor(synthetic_fights)
+    snapshot_predictor.fighter_snapshots = snapshots
+
+    for fighter_name in 'ABCDEF':
+        for event_date in probe_dates(synthetic_fights, fighter_name):
+            live = predictor.get_history_features(fighter_name, event_date)
+            cached = snapshot_predictor.get_history_features(fighter_name, event_date)
+            for key in ('wins', 'losses', 'total', 'win_streak', 'days_since_last_fight'):
+                assert cached[key] == live[key], (fighter_name, event_date, key)
+            np.testing.assert_array_equal(cached['ema_values'], live['ema_values'])
+
+@pytest.mark.skipif(not (BACKEND_DIR / 'data/ufc_cleaned.csv').exists(), reason="needs data/ufc_cleaned.csv")
+def test_real_fighters_with_same_day_bouts_match_reference():
+    df = pd.read_csv(BACKEND_DIR / 'data/ufc_cleaned.csv')
+    df['event_date'] = pd.to_datetime(df['event_date'])
+    predictor = history_predictor(df)
+
+    appearances = pd.concat([
+        df[['p1_fighter', 'event_date']].set_axis(['fighter', 'event_date'], axis=1),
+        df[['p2_fighter', 'event_date']].set_axis(['fighter', 'event_date'], axis=1)
+    ])
+    per_day = appearances.groupby(['fighter', 'event_date']).size()
+    tied = per_day[per_day > 1].reset_index()[['fighter', 'event_date']]
+    assert len(tied), "expected fighters with more than one bout on a day"
+
+    # Just after the tied day, where the order of that day's bouts decides the features
+    for fighter_name, tie_date in tied.itertuples(index=False):
+        assert_history_matches(df, predictor, fighter_name, tie_date + pd.Timedelta(days=1))
@@ -0,0 +1,64 @@
+# test_public_events.py
+import pytest
+
+from app.core.config import settings
+
+from conftest import add_events
+
+@pytest.fixture(params=[True, False], ids=['cache', 'database'])
+def cache_enabled(request, monkeypatch):
+    monkeypatch.setattr(settings, 'public_events_cache_enabled', request.param)
+    return request.param
+
+def test_matching_if_none_match_gets_304(client, user, cache_enabled):
+    add_events(user, 3, 1)
+    first = client.get('/api/public-events')
+    assert first.status_code == 200
+    assert 'Last-Modified' not in first.headers
+
+    again = client.get('/api/public-events', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == first.headers['ETag']
+
+def test_if_modified_since_is_ignored(client, user, cache_enabled):
+    add_events(user, 1, 1)
+    response = client.get('/api/public-events', headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'})
+    assert response.status_code == 200
+
+def test_deleting_an_event_changes_the_etag(client, user, cache_enabled):
+    from auth import create_user_access_token
+
+    headers = {'Authorization': f'Bearer {create_user_access_token(user)}'}
+    # Newer than every other event, so it is on the first page
+    deleted = client.post('/api/events', headers=headers, json={'name': 'Cancelled', 'date': '2099-01-01'}).json()
+    before = client.get('/api/public-events')
+    assert before.json()[0]['id'] == deleted['id']
+    assert client.delete(f"/api/events/{deleted['id']}", headers=headers).status_code == 200
+
+    after = client.get('/api/public-events', headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert deleted['id'] not in [event['id'] for event in after.json()]
+
+def test_write_succeeds_when_the_cache_cannot_be_built(client, user, monkeypatch):
+    from app.routes import events
+    from auth import create_user_access_token
+
+    def broken_cache():
+        raise RuntimeError("cache backend unavailable")
+
+    monkeypatch.setattr(settings, 'public_events_cache_enabled', True)
+    monkeypatch.setattr(events, 'get_public_events_cache', broken_cache)
+    headers = {'Authorization': f'Bearer {create_user_access_token(user)}'}
+    response = client.post('/api/events', headers=headers, json={'name': 'Saved', 'date': '2024-06-01'})
+    assert response.status_code == 200
+    assert response.json()['name'] == 'Saved'
+
+def test_redis_backend_needs_a_url():
+    from pydantic import ValidationError
+    from app.core.config import Settings
+
+    with pytest.raises(ValidationError, match='redis_url'):
+        Settings(public_events_cache_backend='redis', redis_url=None)
+    with pytest.raises(ValidationError, match='memory'):
+        Settings(public_events_cache_backend='memcached')
+    assert Settings(public_events_cache_backend='redis', redis_url='redis://localhost:6379/0').redis_url
@@ -0,0 +1,35 @@
+# test_result_cache.py
+import numpy as np
+
+from app.services.result_cache import PredictionResultCache
+
+def cached(cache, fingerprint, value=None):
+    key, mirrored = cache.make_key(fingerprint, 'A', 'B', '2024-01-01T00:00:00', 'Herb Dean', 'winner')
+    if value is not None:
+        cache.put(key, mirrored, np.array(value))
+    return cache.get(key, mirrored)
+
+def test_requests_on_a_replaced_state_bypass_the_cache():
+    cache = PredictionResultCache(max_entries=10, max_bytes=1 << 20)
+    cache.set_fingerprint('old')
+    np.testing.assert_array_equal(cached(cache, 'old', [0.6, 0.4]), [0.6, 0.4])
+
+    # Hot reload installs a new state while old requests are still finishing
+    cache.set_fingerprint('new')
+    assert cache.stats()['invalidations'] == 1
+    np.testing.assert_array_equal(cached(cache, 'new', [0.7, 0.3]), [0.7, 0.3])
+
+    for _ in range(3):
+        # Old and new requests interleave: the old ones neither hit nor clear
+        assert cached(cache, 'old', [0.6, 0.4]) is None
+        np.testing.assert_array_equal(cached(cache, 'new'), [0.7, 0.3])
+
+    stats = cache.stats()
+    assert stats['invalidations'] == 1
+    assert stats['entries'] == 1
+    assert stats['bypassed'] == 3
+
+def test_nothing_is_cached_before_a_state_is_installed():
+    cache = PredictionResultCache(max_entries=10, max_bytes=1 << 20)
+    assert cached(cache, 'first', [0.5, 0.5]) is None
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,62 @@
+# test_shap_renderer.py
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+from app.services.shap_renderer import ShapRenderPool
+
+class FakeFuture:
+    def __init__(self, value=None, error=None):
+        self.value, self.error = value, error
+
+    def result(self, timeout=None):
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+class BrokenPool:
+    """A process pool whose renderers have died: every submitted render fails."""
+
+    def __init__(self, barrier):
+        self.barrier = barrier
+        self.shutdowns = 0
+
+    def submit(self, *args):
+        # Let every caller submit before any of them sees the failure
+        self.barrier.wait(5)
+        return FakeFuture(error=BrokenProcessPool("renderer died"))
+
+    def shutdown(self, wait=True):
+        self.shutdowns += 1
+
+class HealthyPool:
+    def submit(self, *args):
+        return FakeFuture(value=b'png')
+
+    def shutdown(self, wait=True):
+        pass
+
+def test_concurrent_failures_replace_a_broken_pool_once(monkeypatch):
+    n_callers = 4
+    broken = BrokenPool(threading.Barrier(n_callers))
+    created = []
+
+    def create_pool():
+        created.append(HealthyPool())
+        return created[-1]
+
+    render_pool = ShapRenderPool(processes=0, recycle_after=0, timeout=5)
+    render_pool._pool = broken
+    monkeypatch.setattr(render_pool, '_create_pool', create_pool)
+
+    results = []
+    callers = [threading.Thread(target=lambda: results.append(render_pool.render('A', 'B', [], 0.6)))
+               for _ in range(n_callers)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join(5)
+
+    assert results == [b'png'] * n_callers
+    assert len(created) == 1 and render_pool._pool is created[0]
+    assert broken.shutdowns == 1
+    assert render_pool.stats()['restarts'] == 1
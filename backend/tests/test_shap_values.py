@@ -0,0 +1,32 @@
+# test_shap_values.py
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+
+def model_rows(predictor, n_rows=20):
+    """Feature rows for real matchups, including fighters with missing stats and no history."""
+    names = sorted(predictor.fighter_lookup)
+    rng = np.random.default_rng(0)
+    rows = []
+    while len(rows) < n_rows:
+        p1, p2 = rng.choice(names, 2, replace=False)
+        try:
+            rows.append(predictor.build_feature_row(p1, p2, pd.Timestamp('2024-01-01'), 'Herb Dean'))
+        except (ValueError, TypeError):
+            continue  # no date of birth
+    return np.vstack(rows)
+
+def test_native_contributions_match_shap_explainer(prediction_state, monkeypatch):
+    predictor = prediction_state.predictor
+    rows = model_rows(predictor)
+    assert np.isnan(rows).any()
+
+    monkeypatch.setattr(settings, 'shap_backend', 'native')
+    native = predictor.compute_shap_matrix(rows)
+    monkeypatch.setattr(settings, 'shap_backend', 'shap')
+    explained = predictor.compute_shap_matrix(rows)
+
+    assert native.shape == explained.shape == rows.shape
+    np.testing.assert_allclose(native, explained, atol=1e-5)
+    np.testing.assert_array_equal(predictor.compute_shap_values(rows[:1]), explained[0])
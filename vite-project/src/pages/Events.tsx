@@ -34,17 +34,33 @@ export default function Events() {
   const [error, setError] = useState<string | null>(null);
   const [expandedMatches, setExpandedMatches] = useState<Record<string, boolean>>({});
   const [expandedEvents, setExpandedEvents] = useState<Record<string, boolean>>({});
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     apiService.getPublicEvents()
-      .then((data: PublicEvent[]) => {
+      .then(({ events: data, nextCursor: cursor }: { events: PublicEvent[]; nextCursor: string | null }) => {
         setEvents(data);
+        setNextCursor(cursor);
         if (data.length > 0) setExpandedEvents({ [data[0].id]: true });
       })
       .catch(err => setError(err.message))
       .finally(() => setLoading(false));
   }, []);
 
+  // Older events are fetched a page at a time, only when asked for
+  const loadMoreEvents = () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    apiService.getPublicEvents({ cursor: nextCursor })
+      .then(({ events: data, nextCursor: cursor }: { events: PublicEvent[]; nextCursor: string | null }) => {
+        setEvents(prev => [...prev, ...data]);
+        setNextCursor(cursor);
+      })
+      .catch(err => setError(err.message))
+      .finally(() => setLoadingMore(false));
+  };
+
   const toggleMatchExpansion = (matchId: string) => {
     setExpandedMatches(prev => ({
       ...prev,
@@ -401,6 +417,18 @@ export default function Events() {
                   )}
                 </Card>
               ))}
+              {nextCursor && (
+                <div className="flex justify-center">
+                  <Button
+                    variant="ghost"
+                    onClick={loadMoreEvents}
+                    disabled={loadingMore}
+                    className="text-white hover:bg-[#33C6FF]/20"
+                  >
+                    {loadingMore ? "Loading..." : "Load More Events"}
+                  </Button>
+                </div>
+              )}
             </div>
           )}
         </div>
@@ -86,7 +86,7 @@ export default function Home() {
     }
   };
 
-  // Function to get 3 random fights from all events
+  // Function to get 3 random fights from the latest events
   const getRandomFights = (events: PublicEvent[]): FightPrediction[] => {
     try {
       console.log("Processing events:", events);
@@ -145,7 +145,8 @@ export default function Home() {
         setError(null);
         
         console.log("Fetching events...");
-        const data = await apiService.getPublicEvents();
+        // The newest page is enough for the featured fights
+        const { events: data } = await apiService.getPublicEvents();
         console.log("Raw API Data:", data);
         
         if (data && Array.isArray(data)) {
@@ -69,9 +69,29 @@ class ApiService {
     return response.json();
   }
 
-  // PUBLIC: Get all public events (no auth required)
-  async getPublicEvents() {
-    return this.makeRequest('/api/public-events', {}, false);
+  // PUBLIC: Get one page of public events, newest first (no auth required)
+  // Pass the returned nextCursor to load the following page; it is null on the last page
+  async getPublicEvents(
+    options: { cursor?: string | null; limit?: number; includePredictions?: boolean } = {}
+  ) {
+    const params = new URLSearchParams();
+    if (options.cursor) params.set('cursor', options.cursor);
+    if (options.limit) params.set('limit', String(options.limit));
+    if (options.includePredictions === false) params.set('include_predictions', 'false');
+    const query = params.toString();
+
+    const response = await fetch(`${API_BASE_URL}/api/public-events${query ? `?${query}` : ''}`, {
+      headers: this.buildHeaders(false),
+    });
+
+    if (!response.ok) {
+      throw new Error(`API Error: ${response.statusText}`);
+    }
+
+    return {
+      events: await response.json(),
+      nextCursor: response.headers.get('X-Next-Cursor'),
+    };
   }
 
   // Auth methods
@@ -56,5 +56,16 @@ export interface BackendPredictionResponse {
     fighter_1_method_percentages?: string[];
     fighter_2_method_percentages?: string[];
     shap_plot?: string;
+    shap_features?: ShapFeature[];
   };
 }
+
+export interface ShapFeature {
+  name: string;
+  shap_value: number;
+  category: string;
+  type: 'combined' | 'individual';
+  color: string;
+  p1_value?: number | null;
+  p2_value?: number | null;
+}